@@ -22,11 +22,15 @@ import hashlib
 from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime
-from collections import Counter
+from collections import Counter, OrderedDict
 from urllib.parse import urlparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 
+from scoring import label_bits, LABEL_BITS
+
 # For Bluesky integration
 try:
     from atproto import Client
@@ -36,12 +40,95 @@ except ImportError:
     Client = None
     post_from_url = None
 
+# Optional: Aho-Corasick automaton for multi-phrase scanning
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: Hyperscan multi-pattern database for keyword scanning
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Optional: RE2 (linear-time matching) for ASCII posts
+try:
+    import re2 as re_engine
+except ImportError:
+    re_engine = None
+
+# Optional: Arrow string kernels for column-wise URL prefiltering
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
 # Label constants
 LOCATION_LABEL = "sensitive-location"
 MEDIA_LABEL = "unverified-media"
 ALERT_LABEL = "community-alert"
 TS_LABEL = "t-and-s"  # Trust and Safety content label
 
+# Label names matching scoring.LABEL_BITS
+BIT_LABELS = (TS_LABEL, LOCATION_LABEL, MEDIA_LABEL, ALERT_LABEL)
+
+# score_batch columns fed to the scoring kernel, in scoring's column order
+SCORE_COLUMNS = ['keyword_score', 'location_score', 'media_score',
+                 'escalation_score', 'ts_content']
+
+# Fixed patterns, compiled once per process and shared by every detector
+_ADDRESS_RE = re.compile(
+    r'\d+\s+[\w\s]+\s+(street|st|avenue|ave|road|rd|boulevard|blvd|drive|dr|lane|ln|way|court|ct|plaza|place|pl)\b'
+)
+_COORD_RE = re.compile(r'[-]?\d{1,3}\.\d+[,\s]+[-]?\d{1,3}\.\d+')
+_TIME_PATTERNS = [
+    r'\b(?:now|right now|immediately|urgent|today|tonight|tomorrow|this morning|this afternoon|this evening)\b',
+    r'\b\d{1,2}:\d{2}\s*(?:am|pm)?\b',
+    r'\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b'
+]
+_TIME_RE = re.compile('|'.join(_TIME_PATTERNS))
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+', re.IGNORECASE)
+# ASCII characters re's \s matches but RE2's does not
+_RE2_NON_SPACE_RE = re.compile(r'[\x0b\x1c-\x1f]')
+_CAPS_RE = re.compile(r'\b[A-Z]{4,}\b')
+# Leetspeak substitutions such as '1c3' or '0p3r'
+_EVASION_RE = re.compile(r'[1|!][cC][3E]|[0o][pP][3E][rR]')
+_LANGUAGE_RES = {
+    'spanish': re.compile(r'[áéíóúñüÁÉÍÓÚÑÜ]'),
+    'chinese': re.compile(r'[\u4e00-\u9fff]'),
+    'arabic': re.compile(r'[\u0600-\u06ff\u0750-\u077f]'),
+    'cyrillic': re.compile(r'[\u0400-\u04ff]'),
+    'hindi': re.compile(r'[\u0900-\u097f]')
+}
+
+
+def _compile_linear(pattern: str):
+    """Compile an RE2 twin of a pattern, or return None without RE2"""
+    if re_engine is None:
+        return None
+    return re_engine.compile(pattern)
+
+
+def _caseless(pattern):
+    """Caseless copy of a lowercase-only pattern (re caches the compile)"""
+    return re.compile(pattern.pattern, pattern.flags | re.IGNORECASE)
+
+
+def _lower_is_caseless(text: str, text_lower: str) -> bool:
+    """Whether lowercase-only patterns on text_lower match what caseless ones on text would"""
+    # lower() lengthens 'İ', which can move word boundaries, and leaves
+    # 'ı' and 'ſ' alone although re.IGNORECASE folds them onto 'i' and 's'
+    return len(text) == len(text_lower) and 'ı' not in text_lower and 'ſ' not in text_lower
+
+
+def _ascii_safe(text: str) -> bool:
+    """Whether RE2's ASCII-only \\d, \\s, \\w and \\b agree with re on this text"""
+    # RE2's \s is only [\t\n\f\r ]; re's also takes \v and \x1c-\x1f
+    return text.isascii() and _RE2_NON_SPACE_RE.search(text) is None
+
 
 class AutomatedLabeler:
     """
@@ -75,7 +162,17 @@ class AutomatedLabeler:
         
         # Performance tracking
         self.stats = Counter()
-        self.cache = {}
+        
+        # Labels of recently seen texts, keyed by a 64-bit BLAKE2b digest
+        self.cache = OrderedDict()
+        self.CACHE_SIZE = 100_000
+        
+        # Texts per task when score_batch fans out to worker processes
+        self.BATCH_CHUNK_SIZE = 256
+        
+        # Fetched (text, embeds) per post URL, so each post is requested once
+        self._post_cache = OrderedDict()
+        self.POST_CACHE_SIZE = 4096
         
     def moderate_post(self, url: str) -> List[str]:
         """
@@ -91,54 +188,218 @@ class AutomatedLabeler:
         
         try:
             # Get post content
-            text = self._get_post_text(url)
-            embeds = self._get_post_embeds(url)
+            text, embeds = self._fetch_post(url)
             
-            # Perform analysis
-            analysis = self._analyze_content(text, embeds)
+            # Reuse labels for repeated text (embeds also affect the media score)
+            key = None
+            cached = None
+            if not embeds:
+                key = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+                cached = self.cache.get(key)
             
-            # Determine labels
-            labels = self._determine_labels(analysis)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                labels = list(cached)
+            else:
+                # Perform analysis
+                analysis = self._analyze_content(text, embeds)
+                
+                # Determine labels
+                labels = self._determine_labels(analysis)
+                
+                if key is not None:
+                    self.cache[key] = tuple(labels)
+                    if len(self.cache) > self.CACHE_SIZE:
+                        self.cache.popitem(last=False)
             
             # Update statistics
-            self.stats['processed'] += 1
+            stats = self.stats
+            stats['processed'] += 1
             for label in labels:
-                self.stats[label] += 1
+                stats[label] += 1
                 
         except Exception as e:
             print(f"Error processing {url}: {e}")
             
         return labels
     
-    def _get_post_text(self, url: str) -> str:
-        """Extract text from post"""
+    def moderate_batch(self, texts: List[str], workers: int = 1) -> List[List[str]]:
+        """
+        Apply moderation to many post texts at once
+        
+        Args:
+            texts: Post texts (raw text, not URLs)
+            workers: Worker processes to score with (1 scores in-process)
+            
+        Returns:
+            List of label lists, one per input text
+        """
+        scores = self.score_batch(texts, workers)
+        labels = self.labels_from_scores(scores)
+        
+        # Update statistics
+        stats = self.stats
+        stats['processed'] += len(labels)
+        for post_labels in labels:
+            stats.update(post_labels)
+                
+        return labels
+    
+    def post_texts(self, posts: List[str]) -> List[str]:
+        """
+        Resolve posts to the text moderate_post would analyze for each
+        
+        Args:
+            posts: Bluesky post URLs or test strings, as moderate_post takes them
+            
+        Returns:
+            Texts for score_batch. Without a client, URLs resolve to ''
+            as in moderate_post; fetched embeds are not carried over.
+        """
+        fetch = self._fetch_post
+        return [fetch(post)[0] if isinstance(post, str) else post for post in posts]
+    
+    def score_batch(self, texts: List[str], workers: int = 1) -> pd.DataFrame:
+        """
+        Run the detection layers over many post texts
+        
+        Args:
+            texts: Post texts (raw text, not URLs)
+            workers: Worker processes to score with (1 scores in-process).
+                Workers build their own default detectors, so more than one
+                worker needs this instance's detectors to be the defaults.
+            
+        Returns:
+            DataFrame with one row per text holding the four layer scores,
+            the T&S flag and the analysis time in milliseconds. Repeated
+            texts are analyzed once and share that row, time included.
+            
+        Raises:
+            ValueError: workers > 1 with customized detectors
+        """
+        # Checked for every call, so results never depend on the batch size
+        if workers > 1 and not self._has_default_detectors():
+            raise ValueError("score_batch with workers > 1 needs the default detectors; "
+                             "this labeler's detectors were customized")
+        
+        # Missing texts (None, NaN, pd.NA) score as empty posts; factorize would
+        # otherwise code them -1 and they would pick up another text's row
+        texts = [text if isinstance(text, str) else '' for text in texts]
+        
+        # Analyze each distinct text once, then scatter back to input order
+        inverse, unique_texts = pd.factorize(pd.Series(texts, dtype=object))
+        unique_texts = list(unique_texts)
+        
+        if workers > 1 and len(unique_texts) > self.BATCH_CHUNK_SIZE:
+            size = self.BATCH_CHUNK_SIZE
+            chunks = [unique_texts[i:i + size] for i in range(0, len(unique_texts), size)]
+            # Spawned, not forked: the Numba kernel's thread pool is not fork-safe
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_worker) as executor:
+                scores = pd.concat(executor.map(_score_chunk, chunks), ignore_index=True)
+        else:
+            scores = self._score_texts(unique_texts)
+            
+        if len(scores) == len(inverse):
+            return scores
+        return scores.iloc[inverse].reset_index(drop=True)
+    
+    def _score_texts(self, texts: List[str]) -> pd.DataFrame:
+        """Score each text in order; the per-text body of score_batch"""
+        # Texts the URL prefilter rules out need no per-text URL scan
+        url_candidates = self.media_checker.url_candidates(texts)
+        if url_candidates is None:
+            url_candidates = np.ones(len(texts), dtype=bool)
+        
+        rows = []
+        append = rows.append
+        analyze = self._analyze_content
+        has_ts_content = self._has_ts_content
+        now = time.perf_counter_ns
+        for text, maybe_urls in zip(texts, url_candidates.tolist()):
+            start_time = now()
+            try:
+                analysis = analyze(text, [], None if maybe_urls else [])
+                append((
+                    analysis['keyword_score'],
+                    analysis['location_score'],
+                    analysis['media_score'],
+                    analysis['escalation_score'],
+                    has_ts_content(analysis),
+                    now() - start_time
+                ))
+            except Exception as e:
+                print(f"Error processing {text}: {e}")
+                append((0, 0, 0, 0, False, now() - start_time))
+                
+        scores = pd.DataFrame(rows, columns=[
+            'keyword_score', 'location_score', 'media_score',
+            'escalation_score', 'ts_content', 'processing_time_ns'
+        ])
+        
+        # Nanosecond timings converted to milliseconds in one pass
+        scores['processing_time_ms'] = scores.pop('processing_time_ns').to_numpy(dtype=np.float64) / 1e6
+        return scores
+    
+    def labels_from_scores(self, scores: pd.DataFrame) -> List[List[str]]:
+        """Vectorized equivalent of _determine_labels over a score_batch frame"""
+        matrix = scores[SCORE_COLUMNS].to_numpy(dtype=np.float64)
+        thresholds = np.array([
+            self.LOCATION_THRESHOLD, self.MEDIA_THRESHOLD,
+            self.ESCALATION_THRESHOLD, self.ICE_CONTENT_THRESHOLD
+        ], dtype=np.float64)
+        bits = label_bits(matrix, thresholds)
+        
+        # Decode each distinct bitmask once, in the order _determine_labels applies them
+        decoded = {}
+        for mask in np.unique(bits).tolist():
+            decoded[mask] = [label for bit, label in zip(LABEL_BITS, BIT_LABELS) if mask & bit]
+        return [list(decoded[mask]) for mask in bits.tolist()]
+    
+    def _fetch_post(self, url: str) -> Tuple[str, List]:
+        """Fetch a post once and return its (text, embeds)"""
+        cached = self._post_cache.get(url)
+        if cached is not None:
+            self._post_cache.move_to_end(url)
+            return cached
+        
+        text = None
+        embeds = []
+        fetched = False
         if self.client and post_from_url:
             try:
                 post = post_from_url(self.client, url)
-                if hasattr(post, 'record') and hasattr(post.record, 'text'):
-                    return post.record.text
-                elif hasattr(post, 'value') and hasattr(post.value, 'text'):
-                    return post.value.text
+                fetched = True
+                for attr in ('record', 'value'):
+                    record = getattr(post, attr, None)
+                    if text is None and hasattr(record, 'text'):
+                        text = record.text
+                    if not embeds and hasattr(record, 'embed'):
+                        embeds = [record.embed]
             except:
                 pass
         
         # For testing without Bluesky connection
-        return url if not url.startswith('http') else ""
+        if text is None:
+            text = url if not url.startswith('http') else ""
+        
+        result = (text, embeds)
+        if fetched:
+            self._post_cache[url] = result
+            if len(self._post_cache) > self.POST_CACHE_SIZE:
+                self._post_cache.popitem(last=False)
+        return result
+    
+    def _get_post_text(self, url: str) -> str:
+        """Extract text from post"""
+        return self._fetch_post(url)[0]
     
     def _get_post_embeds(self, url: str) -> List:
         """Extract embeds from post"""
-        if self.client and post_from_url:
-            try:
-                post = post_from_url(self.client, url)
-                if hasattr(post, 'record') and hasattr(post.record, 'embed'):
-                    return [post.record.embed]
-                elif hasattr(post, 'value') and hasattr(post.value, 'embed'):
-                    return [post.value.embed]
-            except:
-                pass
-        return []
+        return self._fetch_post(url)[1]
     
-    def _analyze_content(self, text: str, embeds: List) -> Dict[str, Any]:
+    def _analyze_content(self, text: str, embeds: List, urls: Optional[List[str]] = None) -> Dict[str, Any]:
         """Perform comprehensive content analysis"""
         analysis = {
             'keyword_score': 0,
@@ -148,23 +409,34 @@ class AutomatedLabeler:
             'details': {}
         }
         
+        # Nothing to scan (e.g. an unfetchable URL); only embeds can score
+        if not text:
+            if embeds:
+                media_score, media_details = self.media_checker.analyze(text, embeds)
+                analysis['media_score'] = media_score
+                analysis['details']['media'] = media_details
+            return analysis
+        
+        # Lowercase once and share it across layers
+        text_lower = text.lower()
+        
         # Layer 1: Keyword Detection
-        kw_score, kw_details = self.keyword_detector.analyze(text)
+        kw_score, kw_details = self.keyword_detector.analyze(text, text_lower)
         analysis['keyword_score'] = kw_score
         analysis['details']['keywords'] = kw_details
         
         # Layer 2: Location Analysis
-        loc_score, loc_details = self.location_analyzer.analyze(text)
+        loc_score, loc_details = self.location_analyzer.analyze(text, text_lower)
         analysis['location_score'] = loc_score
         analysis['details']['locations'] = loc_details
         
         # Layer 3: Media Checking
-        media_score, media_details = self.media_checker.analyze(text, embeds)
+        media_score, media_details = self.media_checker.analyze(text, embeds, urls)
         analysis['media_score'] = media_score
         analysis['details']['media'] = media_details
         
         # Layer 4: Escalation Detection
-        esc_score, esc_details = self.escalation_scanner.analyze(text)
+        esc_score, esc_details = self.escalation_scanner.analyze(text, text_lower)
         analysis['escalation_score'] = esc_score
         analysis['details']['escalation'] = esc_details
         
@@ -181,8 +453,7 @@ class AutomatedLabeler:
         labels = []
         
         # Check for T&S content (Trust and Safety)
-        if (analysis['details'].get('keywords', {}).get('ts_words_matches') or 
-            analysis['details'].get('media', {}).get('ts_domains')):
+        if self._has_ts_content(analysis):
             labels.append(TS_LABEL)
         
         # Check location sensitivity
@@ -203,6 +474,52 @@ class AutomatedLabeler:
             labels.append(ALERT_LABEL)
             
         return labels
+    
+    def _detector_config(self) -> Dict[str, Any]:
+        """Type and public settings (terms, domains, patterns) of each detector"""
+        detectors = {
+            'keyword_detector': self.keyword_detector,
+            'location_analyzer': self.location_analyzer,
+            'media_checker': self.media_checker,
+            'escalation_scanner': self.escalation_scanner,
+            'language_processor': self.language_processor
+        }
+        return {
+            name: (type(detector),
+                   {attr: value for attr, value in vars(detector).items() if not attr.startswith('_')})
+            for name, detector in detectors.items()
+        }
+    
+    def _has_default_detectors(self) -> bool:
+        """Whether the detectors match those a fresh AutomatedLabeler builds"""
+        global _default_detector_config
+        if _default_detector_config is None:
+            _default_detector_config = AutomatedLabeler()._detector_config()
+        return self._detector_config() == _default_detector_config
+    
+    @staticmethod
+    def _has_ts_content(analysis: Dict[str, Any]) -> bool:
+        """Whether the analysis found T&S words or T&S domains"""
+        return bool(analysis['details'].get('keywords', {}).get('ts_words_matches') or
+                    analysis['details'].get('media', {}).get('ts_domains'))
+
+
+# Detector settings of a default labeler, built on first use
+_default_detector_config = None
+
+# Per-process labeler for score_batch workers, built once by _init_worker
+_worker_labeler = None
+
+
+def _init_worker():
+    """Build the worker's labeler once so regex compilation is amortized"""
+    global _worker_labeler
+    _worker_labeler = AutomatedLabeler()
+
+
+def _score_chunk(texts: List[str]) -> pd.DataFrame:
+    """Score one chunk of texts in a worker process"""
+    return _worker_labeler._score_texts(texts)
 
 
 class KeywordDetector:
@@ -272,31 +589,212 @@ class KeywordDetector:
         self._compile_patterns()
         
     def _compile_patterns(self):
-        """Compile regex patterns for efficient matching"""
+        """Compile regex patterns for efficient matching (terms are lowercase)"""
         self.patterns = {}
         
         # Primary pattern
         primary = '|'.join(re.escape(term) for term in self.primary_terms)
-        self.patterns['primary'] = re.compile(r'\b(' + primary + r')\b', re.IGNORECASE)
+        self.patterns['primary'] = re.compile(r'\b(' + primary + r')\b')
         
         # High-severity pattern (new)
         high_sev = '|'.join(re.escape(term) for term in self.high_severity_terms)
-        self.patterns['high_severity'] = re.compile(r'\b(' + high_sev + r')\b', re.IGNORECASE)
+        self.patterns['high_severity'] = re.compile(r'\b(' + high_sev + r')\b')
         
         # Spanish pattern  
         spanish = '|'.join(re.escape(term) for term in self.spanish_terms)
-        self.patterns['spanish'] = re.compile(r'\b(' + spanish + r')\b', re.IGNORECASE)
+        self.patterns['spanish'] = re.compile(r'\b(' + spanish + r')\b')
         
         # T&S words pattern
         ts = '|'.join(re.escape(term) for term in self.ts_words)
-        self.patterns['ts_words'] = re.compile(r'\b(' + ts + r')\b', re.IGNORECASE)
+        self.patterns['ts_words'] = re.compile(r'\b(' + ts + r')\b')
         
         # Amplifier pattern
         amps = '|'.join(re.escape(term) for term in self.amplifiers)
-        self.patterns['amplifier'] = re.compile(r'\b(' + amps + r')\b', re.IGNORECASE)
+        self.patterns['amplifier'] = re.compile(r'\b(' + amps + r')\b')
+        
+        self._compile_engines()
+        
+    def _compile_engines(self):
+        """Build the optional matching engines from self.patterns"""
+        # RE2 twins for ASCII posts
+        self._linear_patterns = None
+        if re_engine is not None:
+            self._linear_patterns = {
+                category: _compile_linear(pattern.pattern)
+                for category, pattern in self.patterns.items()
+            }
+        
+        # Hyperscan database covering every term of every category at once,
+        # or an Aho-Corasick automaton over the same terms without Hyperscan.
+        # Either needs every pattern to be a plain term alternation
+        self._hs_db = None
+        self._term_automaton = None
+        term_lists = self._term_lists()
+        if term_lists is not None and hyperscan is not None:
+            self._compile_hyperscan(term_lists)
+        elif term_lists is not None and ahocorasick is not None:
+            self._compile_automaton(term_lists)
+        
+    def _term_lists(self) -> Optional[Dict[str, List[str]]]:
+        """
+        Keyword terms per category, read back from the patterns in
+        alternation order, or None if any pattern is not a \\b(term|...)\\b
+        alternation of escaped terms that start and end with word characters
+        """
+        term_lists = {}
+        is_word = lambda ch: ch.isalnum() or ch == '_'
+        for category, pattern in self.patterns.items():
+            source = pattern.pattern
+            if (not isinstance(source, str) or pattern.flags & ~(re.UNICODE | re.IGNORECASE) or
+                    not (source.startswith(r'\b(') and source.endswith(r')\b'))):
+                return None
+            alternation = source[3:-3]
+            terms = [re.sub(r'\\(.)', r'\1', part)
+                     for part in re.findall(r'(?:\\.|[^\\|])+', alternation)]
+            if '|'.join(re.escape(term) for term in terms) != alternation:
+                return None
+            if not all(term and is_word(term[0]) and is_word(term[-1]) for term in terms):
+                return None
+            term_lists[category] = terms
+        return term_lists
+        
+    def _compile_hyperscan(self, term_lists: Dict[str, List[str]]):
+        """Compile all keyword terms into a single Hyperscan database"""
+        # Match ids index into this table of (category, position in category)
+        self._hs_terms = []
+        expressions = []
+        for category, terms in term_lists.items():
+            for i, term in enumerate(terms):
+                self._hs_terms.append((category, i))
+                expressions.append(re.escape(term).encode('utf-8'))
+        
+        # Hyperscan has no Unicode-aware \b, so terms are compiled as plain
+        # literals and word boundaries are checked on each match instead
+        flags = hyperscan.HS_FLAG_SOM_LEFTMOST | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+        self._hs_db = hyperscan.Database()
+        self._hs_db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[flags] * len(expressions)
+        )
+        
+    def _compile_automaton(self, term_lists: Dict[str, List[str]]):
+        """Compile all keyword terms into a single Aho-Corasick automaton"""
+        # A term listed in several categories maps to all of its (category, position)
+        term_info = {}
+        for category, terms in term_lists.items():
+            for i, term in enumerate(terms):
+                term_info.setdefault(term, []).append((category, i))
+        
+        self._term_automaton = ahocorasick.Automaton()
+        for term, entries in term_info.items():
+            self._term_automaton.add_word(term, (len(term), tuple(entries)))
+        self._term_automaton.make_automaton()
+        
+    @staticmethod
+    def _leftmost_matches(matches: List[Tuple[int, int, int]], is_boundary) -> List[Tuple[int, int]]:
+        """
+        Reduce every (start, position, end) term match to the leftmost,
+        first-listed, non-overlapping ones bounded by word boundaries, which
+        is what findall on the category's \\b(term|...)\\b alternation returns
+        """
+        kept = []
+        pos = 0
+        for start, _, end in sorted(matches):
+            if start >= pos and is_boundary(start) and is_boundary(end):
+                kept.append((start, end))
+                pos = end
+        return kept
+        
+    def _find_terms(self, text: str, text_lower: str) -> Dict[str, List[str]]:
+        """Return the matched terms per category, as a caseless findall on text would"""
+        # Posts where lowercasing is not a caseless match are matched as-is
+        if not _lower_is_caseless(text, text_lower):
+            return {category: _caseless(pattern).findall(text)
+                    for category, pattern in self.patterns.items()}
+        
+        # Matching runs on the lowercased text, but terms are read back from
+        # the original so case variants ('ICE', 'ice') still count separately
+        original = lambda start, end: text[start:end]
+        
+        if self._term_automaton is not None:
+            hits = {category: [] for category in self.patterns}
+            for last, (length, entries) in self._term_automaton.iter(text_lower):
+                end = last + 1
+                for category, position in entries:
+                    hits[category].append((end - length, position, end))
+            
+            # Terms start and end with word characters, so an offset is a
+            # boundary unless the characters on both sides are word characters
+            size = len(text_lower)
+            is_word = lambda ch: ch.isalnum() or ch == '_'
+            is_boundary = lambda offset: (offset == 0 or offset == size or
+                                          not (is_word(text_lower[offset - 1]) and is_word(text_lower[offset])))
+            leftmost = self._leftmost_matches
+            return {
+                category: [original(start, end) for start, end in leftmost(matches, is_boundary)]
+                for category, matches in hits.items()
+            }
+        
+        if self._hs_db is None:
+            patterns = self.patterns
+            if self._linear_patterns is not None and _ascii_safe(text_lower):
+                patterns = self._linear_patterns
+            return {
+                category: [original(m.start(), m.end()) for m in pattern.finditer(text_lower)]
+                for category, pattern in patterns.items()
+            }
         
-    def analyze(self, text: str) -> Tuple[int, Dict]:
+        data = text_lower.encode('utf-8')
+        hits = {category: [] for category in self.patterns}
+        terms = self._hs_terms
+        
+        def on_match(match_id, start, end, flags, context):
+            category, position = terms[match_id]
+            hits[category].append((start, position, end))
+        
+        self._hs_db.scan(data, match_event_handler=on_match)
+        
+        # Hyperscan reports byte offsets; convert to character offsets
+        if text_lower.isascii():
+            to_char = lambda offset: offset
+        else:
+            to_char = lambda offset: len(data[:offset].decode('utf-8'))
+        
+        # Hyperscan reports every match; keep the ones findall would return
+        is_boundary = lambda offset: self._is_word_boundary(data, offset)
+        leftmost = self._leftmost_matches
+        return {
+            category: [original(to_char(start), to_char(end)) for start, end in leftmost(matches, is_boundary)]
+            for category, matches in hits.items()
+        }
+        
+    @staticmethod
+    def _is_word_boundary(data: bytes, offset: int) -> bool:
+        """Check whether a byte offset at the edge of a matched term is a \\b"""
+        if offset == 0 or offset == len(data):
+            return True
+        
+        # Decode the UTF-8 characters on either side of the offset
+        begin = offset - 1
+        while begin > 0 and (data[begin] & 0xC0) == 0x80:
+            begin -= 1
+        end = offset + 1
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end += 1
+        before = data[begin:offset].decode('utf-8')
+        after = data[offset:end].decode('utf-8')
+        
+        # Terms start and end with word characters, so the offset is a
+        # boundary unless the neighbouring character is one as well
+        is_word = lambda ch: ch.isalnum() or ch == '_'
+        return not (is_word(before) and is_word(after))
+        
+    def analyze(self, text: str, text_lower: Optional[str] = None) -> Tuple[int, Dict]:
         """Analyze text for keywords and return score"""
+        if text_lower is None:
+            text_lower = text.lower()
         score = 0
         details = {
             'primary_matches': [],
@@ -305,33 +803,37 @@ class KeywordDetector:
             'ts_words_matches': [],
             'amplifiers': []
         }
+        if not text:
+            return score, details
+        
+        term_matches = self._find_terms(text, text_lower)
         
         # Check primary terms
-        primary_matches = self.patterns['primary'].findall(text)
+        primary_matches = term_matches['primary']
         if primary_matches:
             details['primary_matches'] = list(set(primary_matches))  # Dedupe
             score += len(set(primary_matches)) * 8  # Slightly reduced per-match, but more terms
         
         # Check high-severity terms (NEW - give higher score)
-        high_sev_matches = self.patterns['high_severity'].findall(text)
+        high_sev_matches = term_matches['high_severity']
         if high_sev_matches:
             details['high_severity_matches'] = list(set(high_sev_matches))
             score += len(set(high_sev_matches)) * 15  # High weight for severe terms
             
         # Check Spanish terms
-        spanish_matches = self.patterns['spanish'].findall(text)
+        spanish_matches = term_matches['spanish']
         if spanish_matches:
             details['spanish_matches'] = list(set(spanish_matches))
             score += len(set(spanish_matches)) * 10
             
         # Check T&S words
-        ts_matches = self.patterns['ts_words'].findall(text)
+        ts_matches = term_matches['ts_words']
         if ts_matches:
             details['ts_words_matches'] = ts_matches
             # Don't add to main score, but flag for T&S label
             
         # Check amplifiers
-        amp_matches = self.patterns['amplifier'].findall(text)
+        amp_matches = term_matches['amplifier']
         if amp_matches:
             details['amplifiers'] = list(set(amp_matches))
             score += len(set(amp_matches)) * 4  # Slightly increased
@@ -357,26 +859,28 @@ class LocationAnalyzer:
             'community center', 'library', 'university', 'college'
         ]
         
-        # Address pattern
-        self.address_pattern = re.compile(
-            r'\d+\s+[\w\s]+\s+(street|st|avenue|ave|road|rd|boulevard|blvd|drive|dr|lane|ln|way|court|ct|plaza|place|pl)\b',
-            re.IGNORECASE
+        # All places in one pattern; the lookahead finds overlapping
+        # occurrences too, matching the plain substring semantics
+        self.places_pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(place) for place in self.sensitive_places) + '))'
         )
         
-        # Coordinate pattern
-        self.coord_pattern = re.compile(
-            r'[-]?\d{1,3}\.\d+[,\s]+[-]?\d{1,3}\.\d+'
-        )
+        # Address, coordinate and time patterns (module-level, see _ADDRESS_RE);
+        # the time patterns are combined so each post is scanned once
+        self.address_pattern = _ADDRESS_RE
+        self.coord_pattern = _COORD_RE
+        self.time_pattern = _TIME_RE
         
-        # Time patterns
-        self.time_patterns = [
-            r'\b(now|right now|immediately|urgent|today|tonight|tomorrow|this morning|this afternoon|this evening)\b',
-            r'\b\d{1,2}:\d{2}\s*(am|pm|AM|PM)?\b',
-            r'\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b'
-        ]
+        # RE2 twins of the default patterns for ASCII posts (the greedy
+        # address pattern backtracks in re)
+        self._address_linear = _compile_linear(_ADDRESS_RE.pattern)
+        self._coord_linear = _compile_linear(_COORD_RE.pattern)
+        self._time_linear = _compile_linear(_TIME_RE.pattern)
         
-    def analyze(self, text: str) -> Tuple[int, Dict]:
+    def analyze(self, text: str, text_lower: Optional[str] = None) -> Tuple[int, Dict]:
         """Analyze text for location information"""
+        if text_lower is None:
+            text_lower = text.lower()
         score = 0
         details = {
             'addresses': [],
@@ -384,32 +888,50 @@ class LocationAnalyzer:
             'sensitive_places': [],
             'temporal_markers': []
         }
+        if not text:
+            return score, details
+        
+        address_pattern = self.address_pattern
+        coord_pattern = self.coord_pattern
+        time_pattern = self.time_pattern
+        matched_text = text_lower
+        if not _lower_is_caseless(text, text_lower):
+            # Lowercasing is not a caseless match here, so match as-is
+            address_pattern = _caseless(address_pattern)
+            time_pattern = _caseless(time_pattern)
+            matched_text = text
+        elif self._address_linear is not None and _ascii_safe(text):
+            # Twins stand in only for patterns that were not replaced
+            if address_pattern is _ADDRESS_RE:
+                address_pattern = self._address_linear
+            if coord_pattern is _COORD_RE:
+                coord_pattern = self._coord_linear
+            if time_pattern is _TIME_RE:
+                time_pattern = self._time_linear
         
         # Check for addresses
-        addresses = self.address_pattern.findall(text)
+        addresses = address_pattern.findall(matched_text)
         if addresses:
             details['addresses'] = addresses
             score += len(addresses) * 20
             
         # Check for coordinates
-        coords = self.coord_pattern.findall(text)
+        coords = coord_pattern.findall(text)
         if coords:
             details['coordinates'] = coords
             score += 30
             
-        # Check sensitive places
-        text_lower = text.lower()
-        for place in self.sensitive_places:
-            if place in text_lower:
-                details['sensitive_places'].append(place)
-                score += 15
+        # Check sensitive places, counting each place once
+        places = list(dict.fromkeys(self.places_pattern.findall(text_lower)))
+        if places:
+            details['sensitive_places'] = places
+            score += len(places) * 15
                 
         # Check temporal markers
-        for pattern in self.time_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                details['temporal_markers'].extend(matches)
-                score += len(matches) * 3
+        matches = time_pattern.findall(matched_text)
+        if matches:
+            details['temporal_markers'] = matches
+            score += len(matches) * 3
                 
         return score, details
 
@@ -443,13 +965,54 @@ class MediaChecker:
         ]
         
         # URL pattern
-        self.url_pattern = re.compile(
-            r'https?://[^\s<>"{}|\\^`\[\]]+', 
-            re.IGNORECASE
-        )
+        self.url_pattern = _URL_RE
+        self._url_linear = _compile_linear('(?i)' + _URL_RE.pattern)
         
-    def analyze(self, text: str, embeds: List) -> Tuple[int, Dict]:
-        """Analyze media and links"""
+        # Domain lists compiled for host lookups
+        self.verified = self._compile_domains(self.verified_domains)
+        self.suspicious = self._compile_domains(self.suspicious_domains)
+        self.ts = self._compile_domains(self.ts_domains)
+        
+    @staticmethod
+    def _compile_domains(domains: List[str]) -> Tuple[frozenset, Tuple[str, ...], frozenset]:
+        """
+        Split a domain list into full domains ('bit.ly'), suffixes ('.gov')
+        and bare site names ('8chan', 'telegram.') matched against host labels
+        """
+        suffixes = tuple(d for d in domains if d.startswith('.'))
+        others = [d.rstrip('.') for d in domains if not d.startswith('.')]
+        exact = frozenset(d for d in others if '.' in d)
+        names = frozenset(d for d in others if '.' not in d)
+        return exact, suffixes, names
+    
+    @staticmethod
+    def _host_matches(host: str, domains: Tuple[frozenset, Tuple[str, ...], frozenset]) -> bool:
+        """Check a lowercased hostname against a compiled domain list"""
+        exact, suffixes, names = domains
+        parts = host.split('.')
+        return (host.endswith(suffixes) or
+                any('.'.join(parts[i:]) in exact for i in range(len(parts))) or
+                not names.isdisjoint(parts))
+        
+    def url_candidates(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Column-wise prefilter: which texts could contain a URL at all
+        
+        Every default url_pattern match starts with 'http', so texts without
+        it are skipped. Returns None when pyarrow is unavailable or
+        url_pattern was replaced.
+        
+        URL extraction and the domain checks stay in analyze(): Arrow has
+        no find-all regex kernel, its RE2 classes differ from re's, and
+        suffix domains ('.gov') do not map onto pc.is_in.
+        """
+        if pc is None or self.url_pattern is not _URL_RE:
+            return None
+        column = pa.array(texts, type=pa.string())
+        return pc.match_substring(column, 'http', ignore_case=True).to_numpy(zero_copy_only=False)
+        
+    def analyze(self, text: str, embeds: List, urls: Optional[List[str]] = None) -> Tuple[int, Dict]:
+        """Analyze media and links (urls may be passed in if already extracted)"""
         score = 0
         details = {
             'urls': [],
@@ -461,17 +1024,21 @@ class MediaChecker:
         }
         
         # Extract URLs from text
-        urls = self.url_pattern.findall(text)
+        if urls is None:
+            url_pattern = self.url_pattern
+            if url_pattern is _URL_RE and self._url_linear is not None and _ascii_safe(text):
+                url_pattern = self._url_linear
+            urls = url_pattern.findall(text) if text else []
         details['urls'] = urls
         
         for url in urls:
-            url_lower = url.lower()
+            host = (urlparse(url).hostname or '').lower()
             
             # Check if verified
-            is_verified = any(domain in url_lower for domain in self.verified_domains)
+            is_verified = self._host_matches(host, self.verified)
             
             # Check for T&S domains
-            is_ts_domain = any(domain in url_lower for domain in self.ts_domains)
+            is_ts_domain = self._host_matches(host, self.ts)
             if is_ts_domain:
                 details['ts_domains'].append(url)
                 score += 20  # High score for problematic domains
@@ -481,11 +1048,9 @@ class MediaChecker:
                 score += 10
                 
                 # Check if suspicious
-                for suspicious in self.suspicious_domains:
-                    if suspicious in url_lower:
-                        details['suspicious_urls'].append(url)
-                        score += 15
-                        break
+                if self._host_matches(host, self.suspicious):
+                    details['suspicious_urls'].append(url)
+                    score += 15
                         
         # Check embeds
         for embed in embeds:
@@ -548,8 +1113,56 @@ class EscalationScanner:
             'death', 'die', 'dead', 'gas', 'hang', 'lynch'
         ]
         
-    def analyze(self, text: str) -> Tuple[int, Dict]:
+        # Phrase lists scored per matched phrase: (details key, phrases, weight)
+        self.phrase_groups = [
+            ('panic_phrases', self.panic_phrases, 8),
+            ('mobilization_phrases', self.mobilization_phrases, 10),
+            ('news_concern_phrases', self.news_concern_phrases, 6),
+            ('fear_phrases', self.fear_phrases, 7),
+            ('violence', self.violence_terms, 0)
+        ]
+        
+        # Map every phrase to the groups it belongs to, in list order
+        self._phrase_info = {}
+        for category, phrases, weight in self.phrase_groups:
+            for phrase in phrases:
+                self._phrase_info.setdefault(phrase, []).append((category, weight))
+        self._phrase_rank = {phrase: i for i, phrase in enumerate(self._phrase_info)}
+        
+        # Build one automaton over all phrases so each post is scanned once
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for phrase in self._phrase_info:
+                self._automaton.add_word(phrase, phrase)
+            self._automaton.make_automaton()
+        else:
+            # Without pyahocorasick, a single alternation tried at every
+            # position reports the longest phrase starting there; any other
+            # phrase starting at the same position is a prefix of it
+            longest_first = sorted(self._phrase_info, key=len, reverse=True)
+            self._phrase_re = re.compile(
+                '(?=(' + '|'.join(re.escape(phrase) for phrase in longest_first) + '))'
+            )
+            self._phrase_prefixes = {
+                phrase: [other for other in self._phrase_info if phrase.startswith(other)]
+                for phrase in self._phrase_info
+            }
+        
+    def _find_phrases(self, text_lower: str) -> set:
+        """Return the set of known phrases occurring in the lowercased text"""
+        if self._automaton is not None:
+            return {phrase for _, phrase in self._automaton.iter(text_lower)}
+        
+        hits = set()
+        for phrase in self._phrase_re.findall(text_lower):
+            hits.update(self._phrase_prefixes[phrase])
+        return hits
+        
+    def analyze(self, text: str, text_lower: Optional[str] = None) -> Tuple[int, Dict]:
         """Analyze text for escalatory language"""
+        if text_lower is None:
+            text_lower = text.lower()
         score = 0
         details = {
             'panic_phrases': [],
@@ -560,45 +1173,30 @@ class EscalationScanner:
             'all_caps_words': 0,
             'exclamations': 0
         }
+        if not text:
+            return score, details
         
-        text_lower = text.lower()
+        # Single pass over the text for panic, mobilization, news-style
+        # concern, fear and violence phrases
+        violence_hit = False
+        for phrase in sorted(self._find_phrases(text_lower), key=self._phrase_rank.get):
+            for category, weight in self._phrase_info[phrase]:
+                if category == 'violence':
+                    violence_hit = True
+                else:
+                    details[category].append(phrase)
+                    score += weight
         
-        # Check for violent threats - HIGH PRIORITY
-        for term in self.violence_terms:
-            if term in text_lower:
-                details['violence_detected'] = True
-                score += 25  # High score for violent content
-                break
-        
-        # Check panic phrases
-        for phrase in self.panic_phrases:
-            if phrase in text_lower:
-                details['panic_phrases'].append(phrase)
-                score += 8
-                
-        # Check mobilization phrases
-        for phrase in self.mobilization_phrases:
-            if phrase in text_lower:
-                details['mobilization_phrases'].append(phrase)
-                score += 10
-        
-        # Check news-style concern phrases (for actual posts about ICE)
-        for phrase in self.news_concern_phrases:
-            if phrase in text_lower:
-                details['news_concern_phrases'].append(phrase)
-                score += 6  # Moderate score per phrase
-                
-        # Check fear phrases
-        for phrase in self.fear_phrases:
-            if phrase in text_lower:
-                details['fear_phrases'].append(phrase)
-                score += 7
+        # Violent threats - HIGH PRIORITY, scored once per post
+        if violence_hit:
+            details['violence_detected'] = True
+            score += 25  # High score for violent content
                 
         # Check for ALL CAPS
-        caps_words = re.findall(r'\b[A-Z]{4,}\b', text)
-        if caps_words:
-            details['all_caps_words'] = len(caps_words)
-            score += min(len(caps_words) * 2, 10)
+        caps_count = sum(1 for _ in _CAPS_RE.finditer(text))
+        if caps_count:
+            details['all_caps_words'] = caps_count
+            score += min(caps_count * 2, 10)
             
         # Check exclamations
         exclamation_count = text.count('!')
@@ -614,13 +1212,7 @@ class LanguageProcessor:
     
     def __init__(self):
         # Character set patterns for different languages
-        self.language_patterns = {
-            'spanish': re.compile(r'[áéíóúñüÁÉÍÓÚÑÜ]'),
-            'chinese': re.compile(r'[\u4e00-\u9fff]'),
-            'arabic': re.compile(r'[\u0600-\u06ff\u0750-\u077f]'),
-            'cyrillic': re.compile(r'[\u0400-\u04ff]'),
-            'hindi': re.compile(r'[\u0900-\u097f]')
-        }
+        self.language_patterns = _LANGUAGE_RES
         
     def analyze(self, text: str) -> Dict:
         """Detect languages and potential evasion tactics"""
@@ -629,6 +1221,8 @@ class LanguageProcessor:
             'multi_language': False,
             'possible_evasion': False
         }
+        if not text:
+            return details
         
         # Detect languages
         for lang, pattern in self.language_patterns.items():
@@ -641,7 +1235,7 @@ class LanguageProcessor:
             details['possible_evasion'] = True
             
         # Check for character substitution
-        if re.search(r'[1|!][cC][3E]|[0o][pP][3E][rR]', text):
+        if _EVASION_RE.search(text):
             details['possible_evasion'] = True
             
         return details
\ No newline at end of file
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Batch Scoring Kernels for the Community Safety Alert Labeler
+============================================================
+
+Turns the per-post layer scores produced by AutomatedLabeler.score_batch
+into label bitmasks, and counts per-label confusion outcomes for the
+evaluators. The kernels are JIT-compiled with Numba when it is installed
+and fall back to plain NumPy otherwise; both paths give the same result.
+
+Score matrix columns (float64, C-contiguous):
+    keyword_score, location_score, media_score, escalation_score, ts_content
+
+Threshold vector (float64):
+    location, media, escalation, ice_content
+"""
+
+import numpy as np
+
+# Optional: Numba JIT for the scoring kernel
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Label bits, in the order AutomatedLabeler._determine_labels applies them
+TS_BIT = 1
+LOCATION_BIT = 2
+MEDIA_BIT = 4
+ALERT_BIT = 8
+
+LABEL_BITS = (TS_BIT, LOCATION_BIT, MEDIA_BIT, ALERT_BIT)
+
+# Column positions in the score matrix
+KEYWORD_COL, LOCATION_COL, MEDIA_COL, ESCALATION_COL, TS_COL = range(5)
+
+# Rows per parallel work item in the confusion kernel
+CONFUSION_CHUNK = 4096
+
+# Below this many rows the NumPy path beats Numba's JIT and thread startup
+NUMBA_MIN_ROWS = 100_000
+
+
+def _label_bits_numpy(scores: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """Vectorized label bitmask computation"""
+    keyword_score = scores[:, KEYWORD_COL]
+    total_escalation = scores[:, ESCALATION_COL] + keyword_score * 0.8
+
+    bits = np.where(scores[:, TS_COL] != 0, TS_BIT, 0)
+    bits |= np.where(scores[:, LOCATION_COL] >= thresholds[0], LOCATION_BIT, 0)
+    bits |= np.where(scores[:, MEDIA_COL] >= thresholds[1], MEDIA_BIT, 0)
+    bits |= np.where((total_escalation >= thresholds[2]) |
+                     (keyword_score >= thresholds[3]), ALERT_BIT, 0)
+    return bits.astype(np.uint8)
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _label_bits_numba(scores, thresholds):
+        n = scores.shape[0]
+        bits = np.zeros(n, dtype=np.uint8)
+        for i in numba.prange(n):
+            keyword_score = scores[i, KEYWORD_COL]
+            b = 0
+            if scores[i, TS_COL] != 0:
+                b |= TS_BIT
+            if scores[i, LOCATION_COL] >= thresholds[0]:
+                b |= LOCATION_BIT
+            if scores[i, MEDIA_COL] >= thresholds[1]:
+                b |= MEDIA_BIT
+            if (scores[i, ESCALATION_COL] + keyword_score * 0.8 >= thresholds[2] or
+                    keyword_score >= thresholds[3]):
+                b |= ALERT_BIT
+            bits[i] = b
+        return bits
+else:
+    _label_bits_numba = None
+
+
+def label_bits(scores: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """
+    Compute a label bitmask for every row of a score matrix
+
+    Args:
+        scores: (N, 5) float64 matrix in the column order documented above
+        thresholds: Length-4 float64 vector of label thresholds
+
+    Returns:
+        uint8 array of length N with TS/LOCATION/MEDIA/ALERT bits set
+    """
+    scores = np.ascontiguousarray(scores, dtype=np.float64)
+    thresholds = np.ascontiguousarray(thresholds, dtype=np.float64)
+
+    if _label_bits_numba is not None and len(scores) >= NUMBA_MIN_ROWS:
+        return _label_bits_numba(scores, thresholds)
+    return _label_bits_numpy(scores, thresholds)
+
+
+def _confusion_counts_numpy(expected: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+    """Vectorized per-label TP/FP/FN/TN counts"""
+    tp = (expected & predicted).sum(axis=0)
+    fp = (~expected & predicted).sum(axis=0)
+    fn = (expected & ~predicted).sum(axis=0)
+    tn = len(expected) - tp - fp - fn
+    return np.stack([tp, fp, fn, tn]).astype(np.int64)
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _confusion_counts_numba(expected, predicted, chunk):
+        n, n_labels = expected.shape
+        n_chunks = (n + chunk - 1) // chunk
+        
+        # Each chunk of rows counts into its own slot, so threads never share a cell
+        partial = np.zeros((n_chunks, 4, n_labels), dtype=np.int64)
+        for c in numba.prange(n_chunks):
+            for i in range(c * chunk, min(n, (c + 1) * chunk)):
+                for j in range(n_labels):
+                    e = expected[i, j]
+                    p = predicted[i, j]
+                    if e and p:
+                        partial[c, 0, j] += 1
+                    elif p:
+                        partial[c, 1, j] += 1
+                    elif e:
+                        partial[c, 2, j] += 1
+                    else:
+                        partial[c, 3, j] += 1
+        
+        counts = np.zeros((4, n_labels), dtype=np.int64)
+        for c in range(n_chunks):
+            counts += partial[c]
+        return counts
+else:
+    _confusion_counts_numba = None
+
+
+def confusion_counts(expected: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+    """
+    Count per-label confusion outcomes from label-indicator matrices
+    
+    Args:
+        expected: (N, L) boolean matrix of expected labels
+        predicted: (N, L) boolean matrix of predicted labels
+        
+    Returns:
+        (4, L) int64 array whose rows are TP, FP, FN and TN per label
+    """
+    expected = np.ascontiguousarray(expected, dtype=np.bool_)
+    predicted = np.ascontiguousarray(predicted, dtype=np.bool_)
+    
+    if _confusion_counts_numba is not None and len(expected) >= NUMBA_MIN_ROWS:
+        return _confusion_counts_numba(expected, predicted, CONFUSION_CHUNK)
+    return _confusion_counts_numpy(expected, predicted)
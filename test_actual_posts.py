@@ -5,38 +5,123 @@ Evaluation Script for Actual Bluesky Posts
 This script runs the labeler on actual posts from Bluesky and generates statistics.
 """
 
+import re
 import json
-import time
 import sys
 import pandas as pd
 import numpy as np
-from collections import Counter, defaultdict
+from dataclasses import dataclass, asdict
 from typing import List, Dict, Tuple
 
 # Import the labeler
-from policy_proposal_labeler import AutomatedLabeler
+from policy_proposal_labeler import AutomatedLabeler, BIT_LABELS
+from scoring import LABEL_BITS
+
+# Optional: faster JSON encoding for exports
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Label constants
 LOCATION_LABEL = "sensitive-location"
 MEDIA_LABEL = "unverified-media"
 ALERT_LABEL = "community-alert"
 
+# Columns the evaluator reads, with the dtypes to load them as
+EVAL_DTYPES = {
+    'id': 'int64',
+    'text': 'string',
+    'category': 'category',
+    'type': 'category',
+    'label_ice_related': 'int8'
+}
+
+# One bit per label, so a label set is a small int
+LABEL_BIT = dict(zip(BIT_LABELS, LABEL_BITS))
+
+# Sorted label names for every possible bitmask, built once
+COMBO_LABELS = tuple(
+    tuple(sorted(label for label, bit in LABEL_BIT.items() if mask & bit)) or ('no-labels',)
+    for mask in range(1 << len(LABEL_BITS))
+)
+
+# Placeholder text Bluesky returns for posts behind a login wall
+AUTH_REQUIRED_TEXT = "this post requires authentication to view."
+_AUTH_SENTINEL_RE = re.compile(re.escape(AUTH_REQUIRED_TEXT), re.IGNORECASE)
+
+
+@dataclass
+class PostResult:
+    """Outcome of labeling one post"""
+    # Explicit slots (dataclass(slots=True) needs Python 3.10)
+    __slots__ = ('id', 'text', 'predicted', 'category', 'type', 'ice_related',
+                 'processing_time_ms', 'skipped')
+    id: int
+    text: str
+    predicted: tuple
+    category: str
+    type: str
+    ice_related: int
+    processing_time_ms: float
+    skipped: bool
+
 class ActualPostsEvaluator:
     """Evaluator for actual posts without expected labels"""
     
-    def __init__(self, labeler: AutomatedLabeler, test_data_path: str):
+    def __init__(self, labeler: AutomatedLabeler, test_data_path: str, workers: int = 1):
         """
         Initialize evaluator
         
         Args:
             labeler: The labeler instance to test
             test_data_path: Path to CSV with actual posts
+            workers: Worker processes for batch labeling (1 runs in-process)
         """
         self.labeler = labeler
-        self.test_data = pd.read_csv(test_data_path)
-        self.results = []
+        self.workers = workers
+        self.test_data = self._load_posts(test_data_path)
         self.metrics = {}
         
+        # Per-post outcomes as parallel arrays, indexed like test_data
+        n_posts = len(self.test_data)
+        self.skipped = np.zeros(n_posts, dtype=bool)
+        self.processing_times = np.full(n_posts, np.nan)  # NaN until timed
+        self.predicted_labels = np.empty(n_posts, dtype=object)
+        self.label_masks = np.zeros(n_posts, dtype=np.uint8)
+        self.ice_related = np.zeros(n_posts, dtype=np.int8)
+        self.category_codes = np.zeros(n_posts, dtype=np.intp)
+        self.category_names = []
+        self.post_ids = np.empty(n_posts, dtype=object)
+        self.post_types = np.empty(n_posts, dtype=object)
+        self.stored_texts = np.empty(n_posts, dtype=object)  # truncated for storage
+        self._valid_mask = ~self.skipped
+        self._results = None  # materialized PostResult list, built on first access
+        
+    @staticmethod
+    def _load_posts(path: str) -> pd.DataFrame:
+        """Load only the evaluated columns, using the Arrow CSV engine when available"""
+        try:
+            data = pd.read_csv(path, usecols=list(EVAL_DTYPES), dtype=EVAL_DTYPES,
+                               engine='pyarrow')
+        except (ImportError, ValueError):
+            data = pd.read_csv(path, usecols=lambda col: col in EVAL_DTYPES,
+                               dtype=EVAL_DTYPES)
+        # Arrow returns usecols order, the C engine file order; settle on one
+        data = data[[col for col in EVAL_DTYPES if col in data]]
+        
+        # Small integer codes instead of repeated strings; missing values become 'Unknown'
+        for col in ('category', 'type'):
+            if col in data:
+                data[col] = data[col].astype('string').fillna('Unknown').astype('category')
+        return data.rename(columns={'label_ice_related': 'ice_related'})
+    
+    def _column(self, name: str, default) -> list:
+        """A test_data column as a plain list, or the default for every row if absent"""
+        if name in self.test_data:
+            return self.test_data[name].tolist()
+        return [default] * len(self.test_data)
+    
     def run_evaluation(self) -> Dict:
         """Run complete evaluation suite"""
         print("=" * 60)
@@ -73,114 +158,147 @@ class ActualPostsEvaluator:
     
     def _test_all_posts(self):
         """Test labeler on all posts in dataset"""
-        for idx, row in self.test_data.iterrows():
-            start_time = time.time()
-            
-            # Get post text
-            text = str(row['text']) if pd.notna(row['text']) else ""
-            
-            # Skip if text is empty or unavailable
-            if not text or text.lower() == "this post requires authentication to view.":
-                self.results.append({
-                    'id': row.get('id', idx),
-                    'text': text,
-                    'predicted': [],
-                    'category': row.get('category', 'Unknown'),
-                    'type': row.get('type', 'Unknown'),
-                    'ice_related': row.get('label_ice_related', 0),
-                    'processing_time_ms': 0,
-                    'skipped': True
-                })
-                continue
-            
-            # Run labeler (pass text directly since it doesn't start with http)
-            predicted = self.labeler.moderate_post(text)
-            
-            # Calculate processing time
-            processing_time = (time.time() - start_time) * 1000  # Convert to ms
-            
-            # Store results
-            self.results.append({
-                'id': row.get('id', idx),
-                'text': text[:200] + '...' if len(text) > 200 else text,  # Truncate for storage
-                'predicted': predicted,
-                'category': row.get('category', 'Unknown'),
-                'type': row.get('type', 'Unknown'),
-                'ice_related': row.get('label_ice_related', 0),
-                'processing_time_ms': processing_time,
-                'skipped': False
-            })
-            
-            # Progress indicator
-            if (idx + 1) % 25 == 0:
-                print(f"Processed {idx + 1}/{len(self.test_data)} posts...")
+        self._results = None
+        # Get post texts, skipping empty or unavailable ones
+        text_col = self.test_data['text'].astype('string')
+        skip_mask = (text_col.isna() | text_col.eq('') |
+                     text_col.str.fullmatch(_AUTH_SENTINEL_RE)).to_numpy(dtype=bool)
+        texts = text_col.fillna('').tolist()
+        text_lengths = text_col.str.len().fillna(0).to_numpy(dtype=np.int64)
+        skipped_idx = np.flatnonzero(skip_mask).tolist()
+        active_idx = np.flatnonzero(~skip_mask).tolist()
+        
+        # Run labeler on all remaining posts in one batch, resolved as moderate_post would
+        posts = self.labeler.post_texts([texts[idx] for idx in active_idx])
+        scores = self.labeler.score_batch(posts, self.workers)
+        predictions = self.labeler.labels_from_scores(scores)
+        times = scores['processing_time_ms'].tolist()
+        print(f"Processed {len(active_idx)}/{len(self.test_data)} posts...")
+        
+        # Plain column lists, so the loops below never touch pandas
+        n_posts = len(self.test_data)
+        ids = self.test_data['id'].tolist() if 'id' in self.test_data else list(range(n_posts))
+        if 'category' in self.test_data:
+            category_col = self.test_data['category']
+            categories = category_col.cat.codes.tolist()
+            self.category_names = list(category_col.cat.categories)
+        else:
+            categories = [0] * n_posts
+            self.category_names = ['Unknown']
+        types = self._column('type', 'Unknown')
+        ice_flags = self._column('ice_related', 0)
+        
+        self.skipped[:] = skip_mask
+        self.ice_related[:] = ice_flags
+        self.processing_times[active_idx] = times
+        self.category_codes[:] = categories
+        
+        self.post_ids[:] = ids
+        self.post_types[:] = types
+        self.stored_texts[:] = texts
+        for idx in skipped_idx:
+            self.predicted_labels[idx] = ()
+        
+        for idx, predicted in zip(active_idx, predictions):
+            if text_lengths[idx] > 200:
+                self.stored_texts[idx] = texts[idx][:200] + '...'
+            predicted = tuple(predicted)
+            self.predicted_labels[idx] = predicted
+            mask = 0
+            for label in predicted:
+                mask |= LABEL_BIT[label]
+            self.label_masks[idx] = mask
+    
+    def _post_result(self, idx: int) -> PostResult:
+        """Materialize one post's outcome from the per-post arrays"""
+        skipped = bool(self.skipped[idx])
+        return PostResult(
+            self.post_ids[idx],
+            self.stored_texts[idx],
+            self.predicted_labels[idx],
+            self.category_names[self.category_codes[idx]],
+            self.post_types[idx],
+            int(self.ice_related[idx]),
+            0 if skipped else float(self.processing_times[idx]),
+            skipped
+        )
+    
+    @property
+    def results(self) -> List[PostResult]:
+        """Per-post outcomes in dataset order, built once on first access"""
+        if self._results is None:
+            self._results = [self._post_result(idx) for idx in range(len(self.test_data))]
+        return self._results
     
     def _calculate_metrics(self):
         """Calculate comprehensive metrics"""
-        # Filter out skipped posts
-        valid_results = [r for r in self.results if not r.get('skipped', False)]
+        # Filter out skipped posts once; the analyses below reuse the mask
+        valid = self._valid_mask = ~self.skipped
+        valid_posts = int(valid.sum())
         
-        if not valid_results:
+        if not valid_posts:
             self.metrics = {'error': 'No valid posts to analyze'}
             return
         
-        # Label frequency
-        label_counts = Counter()
-        for result in valid_results:
-            for label in result['predicted']:
-                label_counts[label] += 1
+        predicted = self.predicted_labels[valid]
+        times = self.processing_times[valid]
+        
+        # (N, label) boolean matrix straight from the bitmasks
+        bits = np.array(LABEL_BITS, dtype=np.uint8)
+        applied = (self.label_masks[valid][:, None] & bits) != 0
+        has_label = applied.any(axis=1)
+        
+        # Labeled posts as a frame for the grouped analyses
+        self.valid_frame = pd.DataFrame({
+            'category': self.category_codes[valid],
+            'has_label': has_label,
+            'predicted': predicted
+        })
+        
+        # Label frequency, keyed in order of first appearance
+        counts = applied.sum(axis=0)
+        first_seen = np.where(counts > 0, applied.argmax(axis=0), valid_posts)
+        order = np.lexsort((np.arange(len(bits)), first_seen))
+        label_distribution = {BIT_LABELS[i]: int(counts[i]) for i in order if counts[i]}
         
         # Posts with labels vs without
-        posts_with_labels = sum(1 for r in valid_results if r['predicted'])
-        posts_without_labels = len(valid_results) - posts_with_labels
+        posts_with_labels = int(has_label.sum())
+        posts_without_labels = valid_posts - posts_with_labels
         
         # Average labels per post
-        total_labels = sum(len(r['predicted']) for r in valid_results)
-        avg_labels_per_post = total_labels / len(valid_results) if valid_results else 0
-        
-        # Average processing time
-        avg_processing_time = np.mean([r['processing_time_ms'] for r in valid_results])
+        total_labels = int(counts.sum())
+        avg_labels_per_post = total_labels / valid_posts
         
         self.metrics = {
             'total_posts': len(self.test_data),
-            'valid_posts': len(valid_results),
-            'skipped_posts': len(self.results) - len(valid_results),
+            'valid_posts': valid_posts,
+            'skipped_posts': int(self.skipped.sum()),
             'posts_with_labels': posts_with_labels,
             'posts_without_labels': posts_without_labels,
-            'label_distribution': dict(label_counts),
+            'label_distribution': label_distribution,
             'total_labels_applied': total_labels,
             'avg_labels_per_post': avg_labels_per_post,
-            'avg_processing_time_ms': avg_processing_time,
-            'max_processing_time_ms': max(r['processing_time_ms'] for r in valid_results),
-            'min_processing_time_ms': min(r['processing_time_ms'] for r in valid_results)
+            'avg_processing_time_ms': times.mean(),
+            'max_processing_time_ms': float(times.max()),
+            'min_processing_time_ms': float(times.min())
         }
     
     def _calculate_accuracy_precision(self):
         """
         Calculate accuracy and precision using label_ice_related as ground truth.
         """
-        valid_results = [r for r in self.results if not r.get('skipped', False)]
-        if not valid_results:
+        valid = self._valid_mask
+        if not valid.any():
             return
         
-        # Initialize counters
-        true_positives = 0
-        false_positives = 0
-        true_negatives = 0
-        false_negatives = 0
+        is_ice_related = self.ice_related[valid] == 1
+        has_labels = self.label_masks[valid] != 0
         
-        for result in valid_results:
-            is_ice_related = result.get('ice_related', 0) == 1
-            has_labels = len(result['predicted']) > 0
-            
-            if is_ice_related and has_labels:
-                true_positives += 1
-            elif not is_ice_related and has_labels:
-                false_positives += 1
-            elif not is_ice_related and not has_labels:
-                true_negatives += 1
-            elif is_ice_related and not has_labels:
-                false_negatives += 1
+        # 2x2 confusion matrix in one pass: index = 2 * has_labels + is_ice_related
+        confusion = np.bincount(2 * has_labels + is_ice_related, minlength=4)
+        true_negatives, false_negatives, false_positives, true_positives = (
+            int(count) for count in confusion
+        )
         
         total = true_positives + false_positives + true_negatives + false_negatives
         accuracy = (true_positives + true_negatives) / total if total > 0 else 0
@@ -203,182 +321,198 @@ class ActualPostsEvaluator:
     
     def _calculate_per_label_metrics(self):
         """Calculate precision and recall for each individual label type."""
-        valid_results = [r for r in self.results if not r.get('skipped', False)]
-        if not valid_results:
+        valid = self._valid_mask
+        if not valid.any():
             return
         
+        is_ice_related = self.ice_related[valid] == 1
+        is_non_ice = self.ice_related[valid] == 0
+        ice_related_posts = int(is_ice_related.sum())
+        non_ice_posts = int(is_non_ice.sum())
+        
         all_labels = [LOCATION_LABEL, MEDIA_LABEL, ALERT_LABEL]
-        per_label_metrics = {}
         
-        for label in all_labels:
-            times_applied = sum(1 for r in valid_results if label in r['predicted'])
-            times_applied_to_ice = sum(1 for r in valid_results 
-                                       if label in r['predicted'] and r.get('ice_related', 0) == 1)
-            times_applied_to_non_ice = sum(1 for r in valid_results 
-                                           if label in r['predicted'] and r.get('ice_related', 0) == 0)
-            ice_related_posts = sum(1 for r in valid_results if r.get('ice_related', 0) == 1)
-            non_ice_posts = sum(1 for r in valid_results if r.get('ice_related', 0) == 0)
-            
-            label_precision = times_applied_to_ice / times_applied if times_applied > 0 else 0
-            label_recall = times_applied_to_ice / ice_related_posts if ice_related_posts > 0 else 0
-            fp_rate = times_applied_to_non_ice / non_ice_posts if non_ice_posts > 0 else 0
-            
+        # (N, 3) matrix of label applications, reduced column-wise
+        bits = np.array([LABEL_BIT[label] for label in all_labels], dtype=np.uint8)
+        applied = (self.label_masks[valid][:, None] & bits) != 0
+        times_applied = applied.sum(axis=0)
+        applied_to_ice = (applied & is_ice_related[:, None]).sum(axis=0)
+        applied_to_non_ice = (applied & is_non_ice[:, None]).sum(axis=0)
+        
+        per_label_metrics = {}
+        for label, n_applied, n_ice, n_non_ice in zip(
+                all_labels, times_applied.tolist(), applied_to_ice.tolist(),
+                applied_to_non_ice.tolist()):
             per_label_metrics[label] = {
-                'times_applied': times_applied,
-                'applied_to_ice_related': times_applied_to_ice,
-                'applied_to_non_ice': times_applied_to_non_ice,
-                'precision': label_precision,
-                'recall': label_recall,
-                'false_positive_rate': fp_rate
+                'times_applied': n_applied,
+                'applied_to_ice_related': n_ice,
+                'applied_to_non_ice': n_non_ice,
+                'precision': n_ice / n_applied if n_applied > 0 else 0,
+                'recall': n_ice / ice_related_posts if ice_related_posts > 0 else 0,
+                'false_positive_rate': n_non_ice / non_ice_posts if non_ice_posts > 0 else 0
             }
         
         self.metrics['per_label_metrics'] = per_label_metrics
     
     def _analyze_performance(self):
         """Analyze performance characteristics"""
-        valid_results = [r for r in self.results if not r.get('skipped', False)]
-        if not valid_results:
+        valid = self._valid_mask
+        if not valid.any():
             return
             
-        processing_times = [r['processing_time_ms'] for r in valid_results]
+        processing_times = self.processing_times[valid]
+        p50, p95, p99 = np.percentile(processing_times, [50, 95, 99])
         
         self.metrics['performance'] = {
-            'median_time_ms': np.median(processing_times),
-            'std_time_ms': np.std(processing_times),
-            '95th_percentile_ms': np.percentile(processing_times, 95),
-            '99th_percentile_ms': np.percentile(processing_times, 99)
+            'median_time_ms': float(p50),
+            'std_time_ms': float(processing_times.std()),
+            '95th_percentile_ms': float(p95),
+            '99th_percentile_ms': float(p99)
         }
     
     def _analyze_by_category(self):
         """Analyze performance by post category"""
-        valid_results = [r for r in self.results if not r.get('skipped', False)]
-        if not valid_results:
+        valid = self._valid_mask
+        if not valid.any():
             return
-            
-        category_stats = defaultdict(lambda: {'total': 0, 'with_labels': 0, 'labels': Counter()})
         
-        for result in valid_results:
-            category = result['category']
-            category_stats[category]['total'] += 1
-            if result['predicted']:
-                category_stats[category]['with_labels'] += 1
-            for label in result['predicted']:
-                category_stats[category]['labels'][label] += 1
+        frame = self.valid_frame
+        
+        # Groups keep first-appearance order, as the per-post dict updates did
+        totals = frame.groupby('category', sort=False)['has_label'].agg(['size', 'sum'])
+        label_counts = (frame[['category', 'predicted']].explode('predicted')
+                        .dropna(subset=['predicted'])
+                        .groupby(['category', 'predicted'], sort=False).size())
+        
+        label_distribution = {code: {} for code in totals.index}
+        for (code, label), count in label_counts.items():
+            label_distribution[code][label] = int(count)
         
         category_analysis = {}
-        for category, stats in category_stats.items():
-            category_analysis[category] = {
-                'total_posts': stats['total'],
-                'posts_with_labels': stats['with_labels'],
-                'label_rate': stats['with_labels'] / stats['total'] if stats['total'] > 0 else 0,
-                'label_distribution': dict(stats['labels'])
+        for code, total, with_labels in zip(totals.index, totals['size'].tolist(), totals['sum'].tolist()):
+            category_analysis[self.category_names[code]] = {
+                'total_posts': total,
+                'posts_with_labels': with_labels,
+                'label_rate': with_labels / total if total > 0 else 0,
+                'label_distribution': label_distribution[code]
             }
         
         self.metrics['category_analysis'] = category_analysis
     
     def _analyze_label_distribution(self):
         """Analyze label combinations"""
-        valid_results = [r for r in self.results if not r.get('skipped', False)]
-        if not valid_results:
+        valid = self._valid_mask
+        if not valid.any():
             return
             
-        # Label combinations
-        label_combinations = Counter()
-        for result in valid_results:
-            if result['predicted']:
-                combo = tuple(sorted(result['predicted']))
-                label_combinations[combo] += 1
-            else:
-                label_combinations[('no-labels',)] += 1
+        # Label combinations as bitmasks, ranked like Counter.most_common:
+        # by count, ties in order of first appearance
+        masks, first_seen, counts = np.unique(self.label_masks[valid],
+                                              return_index=True, return_counts=True)
+        top = np.lexsort((first_seen, -counts))[:10]
         
         self.metrics['label_combinations'] = {
-            str(k): v for k, v in label_combinations.most_common(10)
+            str(COMBO_LABELS[masks[i]]): int(counts[i]) for i in top
         }
     
     def _generate_report(self):
         """Generate comprehensive evaluation report"""
-        print("\n" + "=" * 60)
-        print("EVALUATION RESULTS - ACTUAL POSTS")
-        print("=" * 60)
+        # Lines are collected and written to stdout in one go
+        lines = []
+        out = lines.append
+        
+        out("\n" + "=" * 60)
+        out("EVALUATION RESULTS - ACTUAL POSTS")
+        out("=" * 60)
         
         # Overall metrics
-        print(f"\n[OVERALL METRICS]")
-        print(f"  - Total Posts: {self.metrics['total_posts']}")
-        print(f"  - Valid Posts: {self.metrics['valid_posts']}")
-        print(f"  - Skipped Posts: {self.metrics['skipped_posts']}")
-        print(f"  - Posts with Labels: {self.metrics['posts_with_labels']} ({self.metrics['posts_with_labels']/self.metrics['valid_posts']*100:.1f}%)")
-        print(f"  - Posts without Labels: {self.metrics['posts_without_labels']} ({self.metrics['posts_without_labels']/self.metrics['valid_posts']*100:.1f}%)")
-        print(f"  - Total Labels Applied: {self.metrics['total_labels_applied']}")
-        print(f"  - Average Labels per Post: {self.metrics['avg_labels_per_post']:.2f}")
-        print(f"  - Average Processing Time: {self.metrics['avg_processing_time_ms']:.2f} ms")
+        out(f"\n[OVERALL METRICS]")
+        out(f"  - Total Posts: {self.metrics['total_posts']}")
+        out(f"  - Valid Posts: {self.metrics['valid_posts']}")
+        out(f"  - Skipped Posts: {self.metrics['skipped_posts']}")
+        out(f"  - Posts with Labels: {self.metrics['posts_with_labels']} ({self.metrics['posts_with_labels']/self.metrics['valid_posts']*100:.1f}%)")
+        out(f"  - Posts without Labels: {self.metrics['posts_without_labels']} ({self.metrics['posts_without_labels']/self.metrics['valid_posts']*100:.1f}%)")
+        out(f"  - Total Labels Applied: {self.metrics['total_labels_applied']}")
+        out(f"  - Average Labels per Post: {self.metrics['avg_labels_per_post']:.2f}")
+        out(f"  - Average Processing Time: {self.metrics['avg_processing_time_ms']:.2f} ms")
         
         # Accuracy and Precision metrics
         if 'accuracy_metrics' in self.metrics:
             am = self.metrics['accuracy_metrics']
-            print(f"\n[ACCURACY & PRECISION METRICS]")
-            print(f"  (Using 'label_ice_related' as ground truth)")
-            print(f"  ┌─────────────────────────────────────────┐")
-            print(f"  │  Overall Accuracy:    {am['accuracy']:.2%}            │")
-            print(f"  │  Precision:           {am['precision']:.2%}            │")
-            print(f"  │  Recall:              {am['recall']:.2%}            │")
-            print(f"  │  F1 Score:            {am['f1_score']:.2%}            │")
-            print(f"  │  Specificity:         {am['specificity']:.2%}            │")
-            print(f"  └─────────────────────────────────────────┘")
-            print(f"\n  Confusion Matrix:")
-            print(f"                          Predicted")
-            print(f"                      Pos        Neg")
-            print(f"  Actual  Pos (ICE)   TP={am['true_positives']:<4}    FN={am['false_negatives']:<4}")
-            print(f"          Neg         FP={am['false_positives']:<4}    TN={am['true_negatives']:<4}")
+            out(f"\n[ACCURACY & PRECISION METRICS]")
+            out(f"  (Using 'label_ice_related' as ground truth)")
+            out(f"  ┌─────────────────────────────────────────┐")
+            out(f"  │  Overall Accuracy:    {am['accuracy']:.2%}            │")
+            out(f"  │  Precision:           {am['precision']:.2%}            │")
+            out(f"  │  Recall:              {am['recall']:.2%}            │")
+            out(f"  │  F1 Score:            {am['f1_score']:.2%}            │")
+            out(f"  │  Specificity:         {am['specificity']:.2%}            │")
+            out(f"  └─────────────────────────────────────────┘")
+            out(f"\n  Confusion Matrix:")
+            out(f"                          Predicted")
+            out(f"                      Pos        Neg")
+            out(f"  Actual  Pos (ICE)   TP={am['true_positives']:<4}    FN={am['false_negatives']:<4}")
+            out(f"          Neg         FP={am['false_positives']:<4}    TN={am['true_negatives']:<4}")
         
         # Per-label metrics
         if 'per_label_metrics' in self.metrics:
-            print(f"\n[PER-LABEL PRECISION & RECALL]")
-            print(f"  {'Label':<22} {'Applied':<10} {'Precision':<12} {'Recall':<12} {'FP Rate':<10}")
-            print(f"  {'-'*22} {'-'*10} {'-'*12} {'-'*12} {'-'*10}")
+            out(f"\n[PER-LABEL PRECISION & RECALL]")
+            out(f"  {'Label':<22} {'Applied':<10} {'Precision':<12} {'Recall':<12} {'FP Rate':<10}")
+            out(f"  {'-'*22} {'-'*10} {'-'*12} {'-'*12} {'-'*10}")
             for label, stats in self.metrics['per_label_metrics'].items():
-                print(f"  {label:<22} {stats['times_applied']:<10} {stats['precision']:.2%}        {stats['recall']:.2%}        {stats['false_positive_rate']:.2%}")
+                out(f"  {label:<22} {stats['times_applied']:<10} {stats['precision']:.2%}        {stats['recall']:.2%}        {stats['false_positive_rate']:.2%}")
         
         # Label distribution
-        print(f"\n[LABEL DISTRIBUTION]")
+        out(f"\n[LABEL DISTRIBUTION]")
         if self.metrics.get('label_distribution'):
             for label, count in sorted(self.metrics['label_distribution'].items(), key=lambda x: x[1], reverse=True):
                 percentage = count / self.metrics['valid_posts'] * 100
-                print(f"  - {label}: {count} posts ({percentage:.1f}%)")
+                out(f"  - {label}: {count} posts ({percentage:.1f}%)")
         else:
-            print(f"  - No labels applied")
+            out(f"  - No labels applied")
         
         # Performance analysis
         if 'performance' in self.metrics:
-            print(f"\n[PERFORMANCE ANALYSIS]")
-            print(f"  - Median Processing Time: {self.metrics['performance']['median_time_ms']:.2f} ms")
-            print(f"  - 95th Percentile: {self.metrics['performance']['95th_percentile_ms']:.2f} ms")
-            print(f"  - 99th Percentile: {self.metrics['performance']['99th_percentile_ms']:.2f} ms")
+            out(f"\n[PERFORMANCE ANALYSIS]")
+            out(f"  - Median Processing Time: {self.metrics['performance']['median_time_ms']:.2f} ms")
+            out(f"  - 95th Percentile: {self.metrics['performance']['95th_percentile_ms']:.2f} ms")
+            out(f"  - 99th Percentile: {self.metrics['performance']['99th_percentile_ms']:.2f} ms")
         
         # Category analysis
         if 'category_analysis' in self.metrics:
-            print(f"\n[LABEL RATE BY CATEGORY]")
+            out(f"\n[LABEL RATE BY CATEGORY]")
             sorted_categories = sorted(self.metrics['category_analysis'].items(), 
                                      key=lambda x: x[1]['label_rate'], reverse=True)
             for category, stats in sorted_categories[:10]:
-                print(f"  - {category}: {stats['label_rate']:.1%} ({stats['posts_with_labels']}/{stats['total_posts']})")
+                out(f"  - {category}: {stats['label_rate']:.1%} ({stats['posts_with_labels']}/{stats['total_posts']})")
         
         # Label combinations
         if 'label_combinations' in self.metrics:
-            print(f"\n[TOP LABEL COMBINATIONS]")
+            out(f"\n[TOP LABEL COMBINATIONS]")
             for combo, count in list(self.metrics['label_combinations'].items())[:5]:
-                print(f"  - {combo}: {count} posts")
+                out(f"  - {combo}: {count} posts")
         
-        print("\n" + "=" * 60)
-        print("EVALUATION COMPLETE")
-        print("=" * 60)
+        out("\n" + "=" * 60)
+        out("EVALUATION COMPLETE")
+        out("=" * 60)
+        
+        sys.stdout.write('\n'.join(lines) + '\n')
     
     def export_results(self, output_path: str = "evaluation_results_actual.json"):
         """Export detailed results to JSON"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'metrics': self.metrics,
-                'sample_results': self.results[:50]  # First 50 for review
-            }, f, indent=2, default=str)
+        export = {
+            'metrics': self.metrics,
+            'sample_results': [  # First 50 for review
+                asdict(r) for r in map(self._post_result, range(min(50, len(self.test_data))))
+            ]
+        }
+        if orjson is not None:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(export, default=str, option=orjson.OPT_INDENT_2 |
+                                     orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(export, f, indent=2, default=str)
         print(f"\n[EXPORT] Detailed results exported to: {output_path}")
 
 
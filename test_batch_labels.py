@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Batch Labeling Consistency Check
+================================
+The evaluators label posts through score_batch + labels_from_scores
+(scoring.label_bits), while moderate_post labels one post through
+_analyze_content + _determine_labels. This script checks that both paths
+give the same labels, on a grid of scores around every threshold and on
+the dataset posts, so a rule added to only one of them is caught. When
+pyarrow is installed, it also checks that the Arrow URL prefilter and CSV
+loaders leave every label unchanged.
+"""
+
+import contextlib
+import io
+import itertools
+import json
+import subprocess
+import sys
+import os
+
+# '--without-pyarrow' labels as if pyarrow were not installed; pandas picks
+# its string storage on import, so pyarrow is blocked before pandas loads
+if __name__ == "__main__" and '--without-pyarrow' in sys.argv:
+    sys.modules['pyarrow'] = None
+
+import pandas as pd
+
+import policy_proposal_labeler as labeler_module
+from policy_proposal_labeler import AutomatedLabeler, SCORE_COLUMNS
+from test_actual_posts import ActualPostsEvaluator
+from test_evaluation import LabelerEvaluator
+
+# Dataset files and their post text columns (missing files are skipped)
+DATASETS = [
+    ('data.csv', 'Text'),
+    ('data_actual_posts_combined_fixed.csv', 'text'),
+    ('synthetic_posts.csv', 'Post Content')
+]
+
+# Posts around the URL prefilter: mixed-case schemes, 'http' without a URL
+URL_CASES = [
+    'HTTP://BIT.LY/x ICE raid',
+    'see https://t.co/x ICE agents now',
+    'hTtPs://reuters.com/a ice',
+    'http only, no link',
+    'https://8kun.top/ice'
+]
+
+
+def threshold_grid(threshold: float) -> list:
+    """Scores just below, at and just above a threshold, plus zero"""
+    return sorted({0, threshold - 1, threshold - 0.5, threshold, threshold + 0.5, threshold + 1})
+
+
+def analysis_for(keyword: float, location: float, media: float, escalation: float,
+                 ts_content: bool) -> dict:
+    """An _analyze_content result carrying only the given scores"""
+    return {
+        'keyword_score': keyword,
+        'location_score': location,
+        'media_score': media,
+        'escalation_score': escalation,
+        'details': {'keywords': {'ts_words_matches': ['report'] if ts_content else []}}
+    }
+
+
+def check_score_grid(labeler: AutomatedLabeler) -> int:
+    """Compare both paths on every combination of scores around the thresholds"""
+    # Keyword scores also cross the escalation threshold through the 0.8 weight
+    keyword_scores = sorted(set(threshold_grid(labeler.ICE_CONTENT_THRESHOLD)) |
+                            {score / 0.8 for score in threshold_grid(labeler.ESCALATION_THRESHOLD)})
+    rows = list(itertools.product(
+        keyword_scores,
+        threshold_grid(labeler.LOCATION_THRESHOLD),
+        threshold_grid(labeler.MEDIA_THRESHOLD),
+        threshold_grid(labeler.ESCALATION_THRESHOLD),
+        [False, True]
+    ))
+    batch_labels = labeler.labels_from_scores(pd.DataFrame(rows, columns=SCORE_COLUMNS))
+    
+    mismatches = 0
+    for row, predicted in zip(rows, batch_labels):
+        expected = labeler._determine_labels(analysis_for(*row))
+        if predicted != expected:
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"  [grid] {dict(zip(SCORE_COLUMNS, row))}: "
+                      f"expected {expected}, got {predicted}")
+    print(f"score grid: {mismatches} mismatches out of {len(rows)}")
+    return mismatches
+
+
+def check_posts(labeler: AutomatedLabeler) -> int:
+    """Compare both paths on the dataset posts"""
+    texts = dataset_texts() + URL_CASES
+    batch_labels = labeler.labels_from_scores(labeler.score_batch(texts))
+    
+    mismatches = 0
+    for text, predicted in zip(texts, batch_labels):
+        expected = labeler._determine_labels(labeler._analyze_content(text, []))
+        if predicted != expected:
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"  [post] {text[:80]!r}: expected {expected}, got {predicted}")
+    print(f"dataset posts: {mismatches} mismatches out of {len(texts)}")
+    return mismatches
+
+
+def dataset_texts() -> list:
+    """Post texts from every dataset file present, in file order"""
+    texts = []
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for file_name, column in DATASETS:
+        path = os.path.join(base_dir, file_name)
+        if os.path.exists(path):
+            texts.extend(pd.read_csv(path, usecols=[column])[column].fillna('').astype(str))
+    return texts
+
+
+def evaluator_labels(labeler: AutomatedLabeler) -> dict:
+    """Predicted labels from each evaluator's loader and batch path"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    labels = {'batch': labeler.labels_from_scores(labeler.score_batch(dataset_texts() + URL_CASES))}
+    with contextlib.redirect_stdout(io.StringIO()):
+        evaluator = LabelerEvaluator(labeler, os.path.join(base_dir, 'data.csv'))
+        evaluator._test_all_posts()
+        labels['LabelerEvaluator'] = [result.predicted for result in evaluator.results]
+        
+        evaluator = ActualPostsEvaluator(labeler, os.path.join(base_dir, 'data_actual_posts_combined_fixed.csv'))
+        evaluator._test_all_posts()
+        labels['ActualPostsEvaluator'] = list(zip(evaluator.post_ids.tolist(),
+                                                  evaluator.predicted_labels.tolist()))
+    return labels
+
+
+def check_pyarrow(labeler: AutomatedLabeler) -> int:
+    """Compare labels with and without pyarrow; skipped when it is not installed"""
+    if labeler_module.pc is None:
+        print("pyarrow: not installed, skipped")
+        return 0
+    
+    # Round-tripped through JSON like the labels from the pyarrow-free run
+    with_arrow = json.loads(json.dumps(evaluator_labels(labeler)))
+    run = subprocess.run([sys.executable, os.path.abspath(__file__), '--without-pyarrow'],
+                         capture_output=True, text=True, check=True)
+    without_arrow = json.loads(run.stdout.splitlines()[-1])
+    mismatches = 0
+    for name, labels in with_arrow.items():
+        if labels != without_arrow[name]:
+            mismatches += 1
+            print(f"  [pyarrow] {name}: labels differ without pyarrow")
+    print(f"pyarrow: {mismatches} mismatches out of {len(with_arrow)} label sets")
+    return mismatches
+
+
+def main():
+    """Check that batch and per-post labeling agree"""
+    labeler = AutomatedLabeler()
+    if '--without-pyarrow' in sys.argv:
+        print(json.dumps(evaluator_labels(labeler)))
+        return 0
+    
+    failures = check_score_grid(labeler)
+    failures += check_posts(labeler)
+    failures += check_pyarrow(labeler)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
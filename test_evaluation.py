@@ -5,36 +5,91 @@ Testing and Evaluation Script for Community Safety Alert Labeler
 This script tests the policy proposal labeler and generates evaluation metrics.
 """
 
+import ast
 import json
-import time
 import sys
 import os
 import pandas as pd
 import numpy as np
-from collections import Counter, defaultdict
+from collections import defaultdict
+from itertools import chain
+from dataclasses import dataclass, asdict
 from typing import List, Dict, Tuple
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # Import the labeler
 from policy_proposal_labeler import AutomatedLabeler
+from scoring import confusion_counts
+
+# Optional: faster JSON encoding for exports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Columns the evaluator reads, with the dtypes to load them as
+EVAL_DTYPES = {
+    'URL': 'string',
+    'Text': 'string',
+    'Expected_Labels': 'string',
+    'Category': 'category'
+}
+
+
+@dataclass
+class EvaluationResult:
+    """Outcome of labeling one test post"""
+    # Explicit slots (dataclass(slots=True) needs Python 3.10)
+    __slots__ = ('id', 'text', 'expected', 'predicted', 'category',
+                 'processing_time_ms', 'correct')
+    id: str
+    text: str
+    expected: list
+    predicted: list
+    category: str
+    processing_time_ms: float
+    correct: bool
 
 class LabelerEvaluator:
     """Comprehensive evaluation system for the labeler"""
     
-    def __init__(self, labeler: AutomatedLabeler, test_data_path: str):
+    def __init__(self, labeler: AutomatedLabeler, test_data_path: str, workers: int = 1):
         """
         Initialize evaluator
         
         Args:
             labeler: The labeler instance to test
             test_data_path: Path to CSV with test data
+            workers: Worker processes for batch labeling (1 runs in-process)
         """
         self.labeler = labeler
-        self.test_data = pd.read_csv(test_data_path)
-        self.results = []
+        self.workers = workers
+        self.test_data = self._load_posts(test_data_path)
+        self.results: List[EvaluationResult] = []
         self.metrics = {}
         
+        # (expected, predicted) label frozensets per result, built once
+        self.label_sets = []
+        
+        # Sorted label universe and (N, L) expected/predicted indicator
+        # matrices, plus per-category counts and errors, filled by _test_all_posts
+        self._labels = []
+        self._expected_matrix = np.zeros((0, 0), dtype=bool)
+        self._predicted_matrix = np.zeros((0, 0), dtype=bool)
+        self._category_results = {}
+        self._errors = []
+        
+        # Per-post processing times, indexed like test_data
+        self.processing_times = np.empty(len(self.test_data), dtype=np.float64)
+        
+    @staticmethod
+    def _load_posts(path: str) -> pd.DataFrame:
+        """Load only the evaluated columns, using the Arrow CSV engine when available"""
+        try:
+            return pd.read_csv(path, usecols=list(EVAL_DTYPES), dtype=EVAL_DTYPES,
+                               engine='pyarrow')
+        except (ImportError, ValueError):
+            return pd.read_csv(path, usecols=list(EVAL_DTYPES), dtype=EVAL_DTYPES)
+        
     def run_evaluation(self) -> Dict:
         """Run complete evaluation suite"""
         print("=" * 60)
@@ -65,92 +120,116 @@ class LabelerEvaluator:
     
     def _test_all_posts(self):
         """Test labeler on all posts in dataset"""
-        for idx, row in self.test_data.iterrows():
-            start_time = time.time()
-            
-            # Get expected labels
-            expected = eval(row['Expected_Labels']) if isinstance(row['Expected_Labels'], str) else row['Expected_Labels']
-            
-            # Run labeler
-            predicted = self.labeler.moderate_post(row['Text'])
-            
-            # Calculate processing time
-            processing_time = (time.time() - start_time) * 1000  # Convert to ms
+        # Run labeler on every post in one batch, resolved as moderate_post
+        # would; blank texts label as empty posts
+        posts = self.labeler.post_texts(self.test_data['Text'].fillna('').tolist())
+        scores = self.labeler.score_batch(posts, self.workers)
+        predictions = self.labeler.labels_from_scores(scores)
+        self.processing_times[:] = scores['processing_time_ms'].to_numpy()
+        print(f"Processed {len(predictions)}/{len(self.test_data)} posts...")
+        
+        # Columns pulled out once as NumPy arrays; the loop never touches pandas
+        ids = self.test_data['URL'].to_numpy()
+        text_col = self.test_data['Text']
+        texts = text_col.to_numpy()
+        snippets = text_col.where(text_col.str.len() <= 100,
+                                  text_col.str.slice(0, 100) + '...').to_numpy()
+        # Expected labels are stored as Python list literals; parse the column once
+        expected_col = self.test_data['Expected_Labels'].map(
+            lambda s: ast.literal_eval(s) if isinstance(s, str) else s).tolist()
+        categories = self.test_data['Category'].to_numpy()
+        
+        # Label sets and their indicator matrices; a post is correct when
+        # its expected and predicted rows are equal
+        self.label_sets = [(frozenset(e), frozenset(p)) for e, p in zip(expected_col, predictions)]
+        all_labels = set()
+        for expected_set, predicted_set in self.label_sets:
+            all_labels |= expected_set | predicted_set
+        self._labels = sorted(all_labels)
+        label_idx = {label: i for i, label in enumerate(self._labels)}
+        self._expected_matrix = self._indicator_matrix([e for e, _ in self.label_sets], label_idx)
+        self._predicted_matrix = self._indicator_matrix([p for _, p in self.label_sets], label_idx)
+        correct_flags = (self._expected_matrix == self._predicted_matrix).all(axis=1).tolist()
+        
+        # Per-category counts and errors are accumulated as results are
+        # produced, so the analyses never rescan self.results
+        category_results = defaultdict(lambda: {'correct': 0, 'total': 0})
+        errors = self._errors
+        
+        append = self.results.append
+        for idx in range(len(self.test_data)):
+            expected = expected_col[idx]
+            predicted = predictions[idx]
+            expected_set, predicted_set = self.label_sets[idx]
+            correct = correct_flags[idx]
             
             # Store results
-            self.results.append({
-                'id': row['URL'],
-                'text': row['Text'],
-                'expected': expected,
-                'predicted': predicted,
-                'category': row['Category'],
-                'processing_time_ms': processing_time,
-                'correct': set(predicted) == set(expected)
-            })
+            result = EvaluationResult(
+                ids[idx],
+                texts[idx],
+                expected,
+                predicted,
+                categories[idx],
+                float(self.processing_times[idx]),
+                correct
+            )
+            append(result)
             
-            # Progress indicator
-            if (idx + 1) % 25 == 0:
-                print(f"Processed {idx + 1}/{len(self.test_data)} posts...")
+            counts = category_results[result.category]
+            counts['total'] += 1
+            if correct:
+                counts['correct'] += 1
+            else:
+                errors.append({
+                    'id': result.id,
+                    'text_snippet': snippets[idx],
+                    'expected': expected,
+                    'predicted': predicted,
+                    'missing_labels': list(expected_set - predicted_set),
+                    'extra_labels': list(predicted_set - expected_set),
+                    'category': result.category
+                })
+        
+        self._category_results = category_results
     
     def _calculate_metrics(self):
         """Calculate comprehensive metrics"""
-        # Initialize counters
-        true_positives = defaultdict(int)
-        false_positives = defaultdict(int)
-        true_negatives = defaultdict(int)
-        false_negatives = defaultdict(int)
-        
-        # Get all possible labels
-        all_labels = set()
-        for r in self.results:
-            all_labels.update(r['expected'])
-            all_labels.update(r['predicted'])
-        
-        # Calculate per-label metrics
-        for result in self.results:
-            expected_set = set(result['expected'])
-            predicted_set = set(result['predicted'])
-            
-            for label in all_labels:
-                if label in expected_set and label in predicted_set:
-                    true_positives[label] += 1
-                elif label in predicted_set and label not in expected_set:
-                    false_positives[label] += 1
-                elif label not in predicted_set and label not in expected_set:
-                    true_negatives[label] += 1
-                elif label in expected_set and label not in predicted_set:
-                    false_negatives[label] += 1
-        
-        # Calculate metrics for each label
-        label_metrics = {}
-        for label in all_labels:
-            tp = true_positives[label]
-            fp = false_positives[label]
-            tn = true_negatives[label]
-            fn = false_negatives[label]
-            
-            precision = tp / (tp + fp) if (tp + fp) > 0 else 0
-            recall = tp / (tp + fn) if (tp + fn) > 0 else 0
-            f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-            accuracy = (tp + tn) / (tp + tn + fp + fn) if (tp + tn + fp + fn) > 0 else 0
-            
-            label_metrics[label] = {
-                'true_positives': tp,
-                'false_positives': fp,
-                'true_negatives': tn,
-                'false_negatives': fn,
-                'precision': precision,
-                'recall': recall,
-                'f1_score': f1,
-                'accuracy': accuracy
+        # All labels seen in expected or predicted sets, in a stable order
+        labels = self._labels
+        
+        # Per-label confusion counts in one pass over the indicator matrices
+        tp, fp, fn, tn = confusion_counts(self._expected_matrix, self._predicted_matrix)
+        
+        # Derived metrics, 0 wherever the denominator is 0
+        def ratio(num, denom):
+            return np.divide(num, denom, out=np.zeros(len(labels)), where=denom > 0)
+        
+        precision = ratio(tp, tp + fp)
+        recall = ratio(tp, tp + fn)
+        f1 = ratio(2 * (precision * recall), precision + recall)
+        accuracy = ratio(tp + tn, tp + tn + fp + fn)
+        
+        label_metrics = {
+            label: {
+                'true_positives': int(tp[j]),
+                'false_positives': int(fp[j]),
+                'true_negatives': int(tn[j]),
+                'false_negatives': int(fn[j]),
+                'precision': float(precision[j]),
+                'recall': float(recall[j]),
+                'f1_score': float(f1[j]),
+                'accuracy': float(accuracy[j])
             }
+            for j, label in enumerate(labels)
+        }
         
         # Overall accuracy
-        correct_predictions = sum(1 for r in self.results if r['correct'])
+        correct_predictions = len(self.results) - len(self._errors)
         overall_accuracy = correct_predictions / len(self.results)
         
         # Average processing time
-        avg_processing_time = np.mean([r['processing_time_ms'] for r in self.results])
+        times = self.processing_times
+        avg_processing_time = times.mean()
         
         self.metrics = {
             'overall_accuracy': overall_accuracy,
@@ -158,33 +237,36 @@ class LabelerEvaluator:
             'total_predictions': len(self.results),
             'label_metrics': label_metrics,
             'avg_processing_time_ms': avg_processing_time,
-            'max_processing_time_ms': max(r['processing_time_ms'] for r in self.results),
-            'min_processing_time_ms': min(r['processing_time_ms'] for r in self.results)
+            'max_processing_time_ms': float(times.max()),
+            'min_processing_time_ms': float(times.min())
         }
     
+    @staticmethod
+    def _indicator_matrix(label_sets, label_idx: Dict[str, int]) -> np.ndarray:
+        """(N, L) boolean matrix with row i marking the labels in label_sets[i]"""
+        lengths = np.fromiter(map(len, label_sets), dtype=np.intp, count=len(label_sets))
+        label_ids = np.fromiter((label_idx[label] for labels in label_sets for label in labels),
+                                dtype=np.intp, count=int(lengths.sum()))
+        matrix = np.zeros((len(label_sets), len(label_idx)), dtype=bool)
+        matrix[np.repeat(np.arange(len(label_sets)), lengths), label_ids] = True
+        return matrix
+    
     def _analyze_performance(self):
         """Analyze performance characteristics"""
-        processing_times = [r['processing_time_ms'] for r in self.results]
+        processing_times = self.processing_times
+        p50, p95, p99 = np.percentile(processing_times, [50, 95, 99])
         
         self.metrics['performance'] = {
-            'median_time_ms': np.median(processing_times),
-            'std_time_ms': np.std(processing_times),
-            '95th_percentile_ms': np.percentile(processing_times, 95),
-            '99th_percentile_ms': np.percentile(processing_times, 99)
+            'median_time_ms': float(p50),
+            'std_time_ms': float(processing_times.std()),
+            '95th_percentile_ms': float(p95),
+            '99th_percentile_ms': float(p99)
         }
     
     def _analyze_by_category(self):
         """Analyze performance by post category"""
-        category_results = defaultdict(lambda: {'correct': 0, 'total': 0})
-        
-        for result in self.results:
-            category = result['category']
-            category_results[category]['total'] += 1
-            if result['correct']:
-                category_results[category]['correct'] += 1
-        
         category_accuracy = {}
-        for category, counts in category_results.items():
+        for category, counts in self._category_results.items():
             accuracy = counts['correct'] / counts['total'] if counts['total'] > 0 else 0
             category_accuracy[category] = {
                 'accuracy': accuracy,
@@ -196,111 +278,112 @@ class LabelerEvaluator:
     
     def _analyze_errors(self):
         """Analyze common error patterns"""
-        errors = []
-        
-        for result in self.results:
-            if not result['correct']:
-                expected_set = set(result['expected'])
-                predicted_set = set(result['predicted'])
-                
-                errors.append({
-                    'id': result['id'],
-                    'text_snippet': result['text'][:100] + '...' if len(result['text']) > 100 else result['text'],
-                    'expected': result['expected'],
-                    'predicted': result['predicted'],
-                    'missing_labels': list(expected_set - predicted_set),
-                    'extra_labels': list(predicted_set - expected_set),
-                    'category': result['category']
-                })
+        errors = self._errors
         
         # Find common error patterns
-        missing_label_counts = Counter()
-        extra_label_counts = Counter()
-        
-        for error in errors:
-            for label in error['missing_labels']:
-                missing_label_counts[label] += 1
-            for label in error['extra_labels']:
-                extra_label_counts[label] += 1
+        missing_labels = list(chain.from_iterable(e['missing_labels'] for e in errors))
+        extra_labels = list(chain.from_iterable(e['extra_labels'] for e in errors))
         
         self.metrics['error_analysis'] = {
             'total_errors': len(errors),
             'error_rate': len(errors) / len(self.results),
-            'most_missed_labels': dict(missing_label_counts.most_common(5)),
-            'most_over_applied_labels': dict(extra_label_counts.most_common(5)),
+            'most_missed_labels': self._most_common(missing_labels, 5),
+            'most_over_applied_labels': self._most_common(extra_labels, 5),
             'sample_errors': errors[:10]  # First 10 errors as examples
         }
     
+    @staticmethod
+    def _most_common(labels: List[str], n: int) -> Dict[str, int]:
+        """Top-n label counts, ranked like Counter.most_common: by count, ties in order of first appearance"""
+        if not labels:
+            return {}
+        values, first_seen, counts = np.unique(np.array(labels, dtype=object),
+                                               return_index=True, return_counts=True)
+        top = np.lexsort((first_seen, -counts))[:n]
+        return {values[i]: int(counts[i]) for i in top}
+    
     def _generate_report(self):
         """Generate comprehensive evaluation report"""
-        print("\n" + "=" * 60)
-        print("EVALUATION RESULTS")
-        print("=" * 60)
+        # Lines are collected and written to stdout in one go
+        lines = []
+        out = lines.append
+        
+        out("\n" + "=" * 60)
+        out("EVALUATION RESULTS")
+        out("=" * 60)
         
         # Overall metrics
-        print(f"\n[OVERALL METRICS]")
-        print(f"  - Overall Accuracy: {self.metrics['overall_accuracy']:.2%}")
-        print(f"  - Correct Predictions: {self.metrics['correct_predictions']}/{self.metrics['total_predictions']}")
-        print(f"  - Average Processing Time: {self.metrics['avg_processing_time_ms']:.2f} ms")
-        print(f"  - Max Processing Time: {self.metrics['max_processing_time_ms']:.2f} ms")
+        out(f"\n[OVERALL METRICS]")
+        out(f"  - Overall Accuracy: {self.metrics['overall_accuracy']:.2%}")
+        out(f"  - Correct Predictions: {self.metrics['correct_predictions']}/{self.metrics['total_predictions']}")
+        out(f"  - Average Processing Time: {self.metrics['avg_processing_time_ms']:.2f} ms")
+        out(f"  - Max Processing Time: {self.metrics['max_processing_time_ms']:.2f} ms")
         
         # Per-label metrics
-        print(f"\n[PER-LABEL METRICS]")
+        out(f"\n[PER-LABEL METRICS]")
         for label, metrics in self.metrics['label_metrics'].items():
-            print(f"\n  {label}:")
-            print(f"    - Precision: {metrics['precision']:.2%}")
-            print(f"    - Recall: {metrics['recall']:.2%}")
-            print(f"    - F1 Score: {metrics['f1_score']:.2%}")
-            print(f"    - TP:{metrics['true_positives']} FP:{metrics['false_positives']} TN:{metrics['true_negatives']} FN:{metrics['false_negatives']}")
+            out(f"\n  {label}:")
+            out(f"    - Precision: {metrics['precision']:.2%}")
+            out(f"    - Recall: {metrics['recall']:.2%}")
+            out(f"    - F1 Score: {metrics['f1_score']:.2%}")
+            out(f"    - TP:{metrics['true_positives']} FP:{metrics['false_positives']} TN:{metrics['true_negatives']} FN:{metrics['false_negatives']}")
         
         # Performance analysis
-        print(f"\n[PERFORMANCE ANALYSIS]")
-        print(f"  - Median Processing Time: {self.metrics['performance']['median_time_ms']:.2f} ms")
-        print(f"  - 95th Percentile: {self.metrics['performance']['95th_percentile_ms']:.2f} ms")
-        print(f"  - 99th Percentile: {self.metrics['performance']['99th_percentile_ms']:.2f} ms")
+        out(f"\n[PERFORMANCE ANALYSIS]")
+        out(f"  - Median Processing Time: {self.metrics['performance']['median_time_ms']:.2f} ms")
+        out(f"  - 95th Percentile: {self.metrics['performance']['95th_percentile_ms']:.2f} ms")
+        out(f"  - 99th Percentile: {self.metrics['performance']['99th_percentile_ms']:.2f} ms")
         
         # Category accuracy
-        print(f"\n[ACCURACY BY CATEGORY]")
+        out(f"\n[ACCURACY BY CATEGORY]")
         sorted_categories = sorted(self.metrics['category_accuracy'].items(), 
                                  key=lambda x: x[1]['accuracy'], reverse=True)
         for category, stats in sorted_categories[:10]:
-            print(f"  - {category}: {stats['accuracy']:.2%} ({stats['correct']}/{stats['total']})")
+            out(f"  - {category}: {stats['accuracy']:.2%} ({stats['correct']}/{stats['total']})")
         
         # Error analysis
-        print(f"\n[ERROR ANALYSIS]")
-        print(f"  • Total Errors: {self.metrics['error_analysis']['total_errors']}")
-        print(f"  • Error Rate: {self.metrics['error_analysis']['error_rate']:.2%}")
+        out(f"\n[ERROR ANALYSIS]")
+        out(f"  • Total Errors: {self.metrics['error_analysis']['total_errors']}")
+        out(f"  • Error Rate: {self.metrics['error_analysis']['error_rate']:.2%}")
         
         if self.metrics['error_analysis']['most_missed_labels']:
-            print(f"\n  Most Frequently Missed Labels:")
+            out(f"\n  Most Frequently Missed Labels:")
             for label, count in self.metrics['error_analysis']['most_missed_labels'].items():
-                print(f"    - {label}: {count} times")
+                out(f"    - {label}: {count} times")
         
         if self.metrics['error_analysis']['most_over_applied_labels']:
-            print(f"\n  Most Frequently Over-Applied Labels:")
+            out(f"\n  Most Frequently Over-Applied Labels:")
             for label, count in self.metrics['error_analysis']['most_over_applied_labels'].items():
-                print(f"    - {label}: {count} times")
+                out(f"    - {label}: {count} times")
         
         # Sample errors
         if self.metrics['error_analysis']['sample_errors']:
-            print(f"\n  Sample Errors (first 3):")
+            out(f"\n  Sample Errors (first 3):")
             for i, error in enumerate(self.metrics['error_analysis']['sample_errors'][:3], 1):
-                print(f"\n    Error {i}:")
-                print(f"      Text: {error['text_snippet']}")
-                print(f"      Expected: {error['expected']}")
-                print(f"      Predicted: {error['predicted']}")
+                out(f"\n    Error {i}:")
+                out(f"      Text: {error['text_snippet']}")
+                out(f"      Expected: {error['expected']}")
+                out(f"      Predicted: {error['predicted']}")
         
-        print("\n" + "=" * 60)
-        print("EVALUATION COMPLETE")
-        print("=" * 60)
+        out("\n" + "=" * 60)
+        out("EVALUATION COMPLETE")
+        out("=" * 60)
+        
+        sys.stdout.write('\n'.join(lines) + '\n')
     
     def export_results(self, output_path: str = "evaluation_results.json"):
         """Export detailed results to JSON"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'metrics': self.metrics,
-                'detailed_results': self.results[:50]  # First 50 for review
-            }, f, indent=2, default=str)
+        export = {
+            'metrics': self.metrics,
+            'detailed_results': [asdict(r) for r in self.results[:50]]  # First 50 for review
+        }
+        if orjson is not None:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(export, default=str, option=orjson.OPT_INDENT_2 |
+                                     orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(export, f, indent=2, default=str)
         print(f"\n[EXPORT] Detailed results exported to: {output_path}")
 
 
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Keyword Engine Equivalence Check
+================================
+KeywordDetector matches terms with Hyperscan, Aho-Corasick or RE2 when
+they are installed, and with lowercase-only re patterns otherwise. This
+script runs every available engine over the dataset posts plus randomly
+generated texts and checks that each returns exactly what a caseless
+findall of each pattern on the original text returns, which is how the
+labeler matched before the engines were added. LocationAnalyzer scores
+are checked against the same caseless search.
+"""
+
+import random
+import re
+import sys
+import os
+
+import pandas as pd
+
+import policy_proposal_labeler as labeler_module
+from policy_proposal_labeler import KeywordDetector, LocationAnalyzer
+
+# Dataset files and their post text columns (missing files are skipped)
+DATASETS = [
+    ('data.csv', 'Text'),
+    ('data_actual_posts_combined_fixed.csv', 'text'),
+    ('data_actual_posts.csv', 'text'),
+    ('synthetic_posts.csv', 'Post Content')
+]
+
+# Random texts mix terms (some uppercased) with characters that exercise
+# word boundaries, case folding ('İ', 'ı', 'ſ'), characters that lengthen
+# when lowercased, and whitespace only re's \s matches (\v, \x1c-\x1f)
+RANDOM_TEXTS = 30000
+RANDOM_SEED = 2
+FILLER = list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 \t\n.,:;/-_!?éİıßſﬁ"
+              "\x0b\x1c\x1f")
+LOCATION_WORDS = ['123', '12:30', 'main', 'street', 'st', 'ave', 'now', 'tonight',
+                  'friday', 'pm', 'school', 'church', '40.7128, -74.0060']
+
+# Posts that matched differently once when only the lowercase patterns ran
+EDGE_CASES = [
+    'ICE RAIDſ',
+    'ıce raid happening now',
+    'İCE raid on Main Street',
+    'Meet at 123\x1fMain\x1fStreet now',
+    'Meet at 123\x1cMain Street'
+]
+
+# Posts with their expected location scores
+LOCATION_CASES = [
+    ('Meet at 123\x1fMain\x1fStreet now', 23),
+    ('Meet at 123\x1cMain Street', 20),
+    ('Meet at 123 Main Street now', 23),
+    ('Meet at 12 Main ſtreet tonıght', 23)
+]
+
+# A category added the way README's "Adding Language Support" describes
+EXTRA_TERMS = ['raide', 'expulsion', 'police des frontières']
+
+
+def build_detectors(extra_terms: list = None) -> dict:
+    """Build one KeywordDetector per available engine, plus the plain re one"""
+    module = labeler_module
+    optional = {
+        'hyperscan': module.hyperscan,
+        'ahocorasick': module.ahocorasick,
+        're_engine': module.re_engine
+    }
+    
+    def build():
+        detector = KeywordDetector()
+        if extra_terms:
+            extra = '|'.join(re.escape(term) for term in extra_terms)
+            detector.patterns['extra'] = re.compile(r'\b(' + extra + r')\b')
+            detector._compile_engines()
+        return detector
+    
+    # Each engine is picked at construction time, so the ones ahead of it in
+    # KeywordDetector's preference order are hidden while it is built
+    engines = [
+        ('hyperscan', 'hyperscan'),
+        ('aho-corasick', 'ahocorasick'),
+        ('re2', 're_engine')
+    ]
+    detectors = {}
+    try:
+        for name, dep in engines:
+            if optional[dep] is not None:
+                detectors[name] = build()
+            setattr(module, dep, None)
+        detectors['re'] = build()
+    finally:
+        for dep, value in optional.items():
+            setattr(module, dep, value)
+    return detectors
+
+
+def caseless_terms(detector: KeywordDetector, text: str) -> dict:
+    """Matched terms per category from a caseless findall on the original text"""
+    return {
+        category: re.compile(pattern.pattern, re.IGNORECASE).findall(text)
+        for category, pattern in detector.patterns.items()
+    }
+
+
+def caseless_location_score(analyzer: LocationAnalyzer, text: str) -> int:
+    """Location score from caseless searches on the original text"""
+    score = 20 * len(re.compile(analyzer.address_pattern.pattern, re.IGNORECASE).findall(text))
+    if analyzer.coord_pattern.search(text):
+        score += 30
+    text_lower = text.lower()
+    score += 15 * sum(place in text_lower for place in analyzer.sensitive_places)
+    score += 3 * len(re.compile(analyzer.time_pattern.pattern, re.IGNORECASE).findall(text))
+    return score
+
+
+def load_texts(detector: KeywordDetector) -> list:
+    """Dataset posts, edge cases and random texts built from the detector's terms"""
+    texts = []
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for file_name, column in DATASETS:
+        path = os.path.join(base_dir, file_name)
+        if os.path.exists(path):
+            texts.extend(str(text) for text in pd.read_csv(path, usecols=[column])[column].dropna())
+    texts.extend(EDGE_CASES)
+    
+    rng = random.Random(RANDOM_SEED)
+    terms = [term for terms in detector._term_lists().values() for term in terms]
+    terms += LOCATION_WORDS + EXTRA_TERMS
+    for _ in range(RANDOM_TEXTS):
+        parts = []
+        for _ in range(rng.randint(1, 25)):
+            if rng.random() < 0.4:
+                term = rng.choice(terms)
+                parts.append(term.upper() if rng.random() < 0.2 else term)
+            else:
+                parts.append(rng.choice(FILLER))
+        texts.append(''.join(parts))
+    return texts
+
+
+def check_keywords(detectors: dict, texts: list) -> int:
+    """Compare each engine against the caseless search; returns mismatches"""
+    failures = 0
+    for name, detector in detectors.items():
+        mismatches = 0
+        for text in texts:
+            expected = caseless_terms(detector, text)
+            actual = detector._find_terms(text, text.lower())
+            if actual != expected:
+                mismatches += 1
+                if mismatches <= 3:
+                    print(f"  [{name}] {text!r}\n    expected {expected}\n    got      {actual}")
+        print(f"{name}: {mismatches} mismatches")
+        failures += mismatches
+    return failures
+
+
+def check_locations(texts: list) -> int:
+    """Check known location scores and every text's score; returns failures"""
+    analyzers = {'re2' if labeler_module.re_engine is not None else 're': LocationAnalyzer()}
+    if labeler_module.re_engine is not None:
+        re_engine = labeler_module.re_engine
+        try:
+            labeler_module.re_engine = None
+            analyzers['re'] = LocationAnalyzer()
+        finally:
+            labeler_module.re_engine = re_engine
+    
+    failures = 0
+    for text, expected in LOCATION_CASES:
+        for name, analyzer in analyzers.items():
+            score = analyzer.analyze(text)[0]
+            if score != expected:
+                failures += 1
+                print(f"  [location {name}] {text!r}: expected score {expected}, got {score}")
+    
+    for name, analyzer in analyzers.items():
+        mismatches = 0
+        for text in texts:
+            expected, actual = caseless_location_score(analyzer, text), analyzer.analyze(text)[0]
+            if actual != expected:
+                mismatches += 1
+                if mismatches <= 3:
+                    print(f"  [location {name}] {text!r}: expected score {expected}, got {actual}")
+        print(f"location {name}: {mismatches} mismatches")
+        failures += mismatches
+    return failures
+
+
+def main():
+    """Compare every keyword engine and the location scores against caseless re"""
+    detectors = build_detectors()
+    texts = load_texts(detectors['re'])
+    print(f"Checking {', '.join(detectors)} on {len(texts)} texts")
+    failures = check_keywords(detectors, texts)
+    
+    print("With an added keyword category:")
+    failures += check_keywords(build_detectors(EXTRA_TERMS), texts)
+    
+    failures += check_locations(texts)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())